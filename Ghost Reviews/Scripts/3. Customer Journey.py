@@ -1,71 +1,68 @@
 import pandas as pd
 import numpy as np
 import random
+import sys
 from datetime import datetime, timedelta
+from pathlib import Path
+
+from journey_engine import (
+    MIN_HISTORY_YEARS, CATEGORY_DEMAND_WEIGHTS, SPEND_BASE, SEARCH_PLATFORMS, PLATFORM_WEIGHTS, RAGE_QUIT_PROBABILITY,
+    TIMESTAMP_NOISE, CandidateIndex, CandidateCache, simulate_journeys
+)
+from columnar import ColumnBuffer
+from noise import Nullify, apply_noise
+from schema import apply_schema, schema_report
+from table_io import read_businesses, write_table
+
+# Shared helpers live in Shared/ at the repository root
+sys.path.append(str(Path(__file__).resolve().parents[2] / 'Shared'))
+from instrument import span # Phase timings, switched on by GENERATOR_* environment variables
 
 # --- Configuration & Seed Control ---
 random.seed(808)
 np.random.seed(808)
 
 # Input dependencies from previous simulations
-BUSINESSES_FILE = 'simulated_businesses.csv' 
-OUTPUT_FILENAME = 'simulated_customer_journeys.csv'
+# 'csv' or 'parquet'; must match the format the business generator wrote
+OUTPUT_FORMAT = 'csv'
+# If `1. Businesses.py` streamed its table (CHUNK_SIZE set), point this at its OUTPUT_PARTS_DIR
+INPUT_PARTS_DIR = None
+BUSINESSES_FILE = INPUT_PARTS_DIR or f'simulated_businesses.{OUTPUT_FORMAT}'
+OUTPUT_FILENAME = f'simulated_customer_journeys.{OUTPUT_FORMAT}'
+
+# Only the business columns this stage uses are loaded
+BUSINESS_COLUMNS = ['business_id', 'category', 'opening_date', 'closure_date', 'latitude', 'longitude', 'average_rating']
 
 NUM_JOURNEYS = 25000  # Scaling up to build enough statistical depth
 TODAY = datetime.now()
-MIN_HISTORY_YEARS = 5
-
-# Demand Power-Laws (Weighted likelihood of someone searching for this category)
-CATEGORY_DEMAND_WEIGHTS = {
-    'Restaurant': 35,
-    'Cafe': 25,
-    'Clothing Store': 10,
-    'Bar': 12,
-    'Bakery': 8,
-    'Gym': 5,
-    'Bookstore': 3,
-    'Electronics Store': 2
-}
-
-# Lognormal Baseline spend params (Mean, Sigma) to replace flat assumptions
-# Real economies feature heavily skewed spend variations
-SPEND_BASE = {
-    'Cafe': (np.log(14.0), 0.6),
-    'Restaurant': (np.log(45.0), 0.8),
-    'Bookstore': (np.log(25.0), 0.5),
-    'Electronics Store': (np.log(150.0), 1.1),
-    'Clothing Store': (np.log(75.0), 0.9),
-    'Bar': (np.log(40.0), 0.7),
-    'Bakery': (np.log(12.0), 0.4),
-    'Gym': (np.log(20.0), 0.3) 
-}
-
-# Realistic Telemetry metadata sources
-SEARCH_PLATFORMS =['iOS Maps', 'Android Google Maps', 'Web Search Desktop', 'Web Search Mobile', 'Direct Link']
+# Pick the journey engine: 'loop' walks one journey at a time (reference implementation),
+# 'vectorized' simulates blocks of thousands via journey_engine.simulate_journeys (same distributions, far faster)
+ENGINE = 'loop'
 
-print("[*] Initializing Spatiotemporal Customer Journey Simulator...")
+# Optional LRU cache of candidate sets per (category, origin grid cell, 30-day bucket); 0 disables.
+# Both engines give the same journeys with or without it; the hit/miss report at the end helps tune the cell and bucket sizes.
+CANDIDATE_CACHE_SIZE = 0
 
-# --- High-Performance Haversine Logic ---
-def vectorized_haversine(lat1, lon1, lat_arr, lon_arr):
-    """Calculates array-based distances instantly."""
-    R = 6371  # Radius of Earth in kilometers
-    dLat = np.radians(lat_arr - lat1)
-    dLon = np.radians(lon_arr - lon1)
-    a = np.sin(dLat / 2)**2 + np.cos(np.radians(lat1)) * np.cos(np.radians(lat_arr)) * np.sin(dLon / 2)**2
-    return R * (2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a)))
+# Output noise, applied as vectorized rules (see noise.py) from their own seed stream.
+# TIMESTAMP_NOISE comes from journey_engine, which shares it with pipeline.py
+TELEMETRY_NOISE = [Nullify('client_lat_origin', 0.02), Nullify('client_lon_origin', 0.02), Nullify('platform', 0.01)]
+noise_rng = np.random.default_rng(809)
+
+print("[*] Initializing Spatiotemporal Customer Journey Simulator...")
 
 # --- Step 1: Self-Healing Data Ingestion ---
 print("[-] Loading infrastructure boundaries (Businesses)...")
 try:
-    df_biz = pd.read_csv(BUSINESSES_FILE)
+    with span('load') as loading:
+        df_biz = read_businesses(BUSINESSES_FILE, columns=BUSINESS_COLUMNS)
+        loading.rows = len(df_biz)
 except FileNotFoundError:
     print(f"[!] Critical Error: Make sure '{BUSINESSES_FILE}' exists in directory.")
     exit()
 
-# System robustness: Date parsing with fallbacks
-df_biz['opening_date'] = pd.to_datetime(df_biz['opening_date'], errors='coerce')
-df_biz['closure_date'] = pd.to_datetime(df_biz['closure_date'], errors='coerce')
-df_biz['average_rating'] = pd.to_numeric(df_biz['average_rating'], errors='coerce').fillna(3.5)
+# System robustness: dates come back from read_businesses already typed (unparseable ones as NaT)
+with span('self-heal', rows=len(df_biz)):
+    df_biz['average_rating'] = pd.to_numeric(df_biz['average_rating'], errors='coerce').fillna(3.5)
 
 # Fast lookups mapping category names
 search_categories = list(CATEGORY_DEMAND_WEIGHTS.keys())
@@ -75,148 +72,163 @@ search_weights = list(CATEGORY_DEMAND_WEIGHTS.values())
 avg_lat, avg_lon = df_biz['latitude'].mean(), df_biz['longitude'].mean()
 
 # Extract list of available IDs and Data arrays
+indexing = span('candidate index', rows=len(df_biz)).start()
 df_biz_cached = df_biz[['business_id', 'category', 'opening_date', 'closure_date', 'latitude', 'longitude', 'average_rating']].copy()
 
+# Per-category spatial and opening-date index: each search only touches businesses near the customer
+# that already existed, and ghost checks read the aligned closure-date array
+candidate_index = CandidateIndex(df_biz_cached)
+candidate_cache = CandidateCache(candidate_index, maxsize=CANDIDATE_CACHE_SIZE) if CANDIDATE_CACHE_SIZE else None
+indexing.stop()
+
 
 # --- Step 2: High-Velocity Journey Engine ---
 print(f"[-] Compacting and running {NUM_JOURNEYS} complex lifecycle trajectories...")
-journeys_list =[]
-
-for i in range(NUM_JOURNEYS):
-    if (i + 1) % 5000 == 0:
-        print(f"    -> Computed {i+1}/{NUM_JOURNEYS} transactions.")
 
-    # 1. Establish the Timestamp of this Journey
-    # History stretches back dynamically. Journey time determines reality state.
-    days_back = int(np.random.beta(2, 5) * (MIN_HISTORY_YEARS * 365))
-    j_datetime = TODAY - timedelta(days=days_back)
+generation = span('generation loop').start()
+if ENGINE == 'vectorized':
+    df_journeys = simulate_journeys(candidate_index, NUM_JOURNEYS, np.random.default_rng(808), today=TODAY, cache=candidate_cache)
+    generation.stop(rows=len(df_journeys))
+else:
+    # Rows go straight into typed column arrays (columnar.py) instead of a list of dicts
+    journeys_list = ColumnBuffer({
+        'journey_id': 'object', 'user_cookie': 'object', 'platform': 'category', 'journey_timestamp': 'object',
+        'client_lat_origin': 'float64', 'client_lon_origin': 'float64', 'search_category': 'category',
+        'distance_driven_km': 'float64', 'intended_biz_target': 'category', 'ghost_collision_event': 'int64',
+        'rage_quit_dropoff': 'int64', 'final_visited_biz': 'category', 'economic_transaction_value': 'float64',
+        'ecosystem_value_leaked': 'float64',
+    })
+
+    for i in range(NUM_JOURNEYS):
+        if (i + 1) % 5000 == 0:
+            print(f"    -> Computed {i+1}/{NUM_JOURNEYS} transactions.")
+
+        # 1. Establish the Timestamp of this Journey
+        # History stretches back dynamically. Journey time determines reality state.
+        days_back = int(np.random.beta(2, 5) * (MIN_HISTORY_YEARS * 365))
+        j_datetime = TODAY - timedelta(days=days_back)
     
-    # 2. Emulate the Need & The Demographic constraint
-    search_cat = random.choices(search_categories, weights=search_weights, k=1)[0]
+        # 2. Emulate the Need & The Demographic constraint
+        search_cat = random.choices(search_categories, weights=search_weights, k=1)[0]
     
-    # Platform footprint & telemetry tracking
-    platform = random.choices(SEARCH_PLATFORMS, weights=[40, 35, 10, 10, 5])[0]
-
-    # Geographic initialization. 10% are extreme out-of-town searches
-    if random.random() < 0.10:
-        c_lat = avg_lat + np.random.normal(0, 0.5) 
-        c_lon = avg_lon + np.random.normal(0, 0.5)
-    else:
-        # Bounded within cluster bounds
-        anchor = df_biz.sample(1).iloc[0]
-        c_lat = anchor['latitude'] + np.random.normal(0, 0.04)
-        c_lon = anchor['longitude'] + np.random.normal(0, 0.04)
-
-    # Calculate intrinsic financial scope (Log Normal Demand curve)
-    base_mu, base_sig = SPEND_BASE[search_cat]
-    planned_spend = max(2.50, round(np.random.lognormal(base_mu, base_sig), 2))
-
-    # --- THE PHYSICAL SIMULATION: What did the search yield AT THIS SPECIFIC DATE? ---
-    # First, rule out businesses that weren't born yet.
-    mask = (df_biz_cached['category'] == search_cat) & (df_biz_cached['opening_date'] <= j_datetime)
-    df_visible = df_biz_cached.loc[mask].copy()
-
-    if df_visible.empty:
-        # Organic data structural reality: Customer searched for a category not present yet in that era
-        continue 
-    
-    # Apply distance computation efficiently
-    df_visible['distance_km'] = vectorized_haversine(c_lat, c_lon, df_visible['latitude'].values, df_visible['longitude'].values)
-
-    # Filter out bizarrely far logic (>100km unless specific conditions exist)
-    df_visible = df_visible[df_visible['distance_km'] < 100]
-    if df_visible.empty: continue
+        # Platform footprint & telemetry tracking
+        platform = random.choices(SEARCH_PLATFORMS, weights=PLATFORM_WEIGHTS)[0]
 
-    # Attractiveness = Rating^3 / (Distance_km + Epsilon). Includes Gaussian SEO Noise.
-    # Imperfect rationality is a major missing feature of basic synthetic datasets.
-    info_friction_noise = np.random.normal(1.0, 0.4, size=len(df_visible)) 
+        # Geographic initialization. 10% are extreme out-of-town searches
+        if random.random() < 0.10:
+            c_lat = avg_lat + np.random.normal(0, 0.5) 
+            c_lon = avg_lon + np.random.normal(0, 0.5)
+        else:
+            # Bounded within cluster bounds
+            anchor = df_biz.sample(1).iloc[0]
+            c_lat = anchor['latitude'] + np.random.normal(0, 0.04)
+            c_lon = anchor['longitude'] + np.random.normal(0, 0.04)
+
+        # Calculate intrinsic financial scope (Log Normal Demand curve)
+        base_mu, base_sig = SPEND_BASE[search_cat]
+        planned_spend = max(2.50, round(np.random.lognormal(base_mu, base_sig), 2))
+
+        # --- THE PHYSICAL SIMULATION: What did the search yield AT THIS SPECIFIC DATE? ---
+        # Rule out businesses that weren't born yet and bizarrely far ones (>100km unless specific conditions exist).
+        # The index returns the same businesses, in the same order, as scanning the whole table.
+        candidate_source = candidate_cache if candidate_cache is not None else candidate_index
+        visible_rows, distance_km = candidate_source.query(search_cat, c_lat, c_lon, j_datetime)
+        if len(visible_rows) == 0:
+            # Organic data structural reality: Customer searched for a category not present yet in that era
+            continue
+
+        # Attractiveness = Rating^3 / (Distance_km + Epsilon). Includes Gaussian SEO Noise.
+        # Imperfect rationality is a major missing feature of basic synthetic datasets.
+        info_friction_noise = np.random.normal(1.0, 0.4, size=len(visible_rows)) 
     
-    df_visible['attractiveness'] = ((df_visible['average_rating']**3) / (df_visible['distance_km'] + 0.5)) * info_friction_noise
+        attractiveness = ((candidate_index.rating[visible_rows]**3) / (distance_km + 0.5)) * info_friction_noise
     
-    # User makes initial decision
-    top_hit = df_visible.loc[df_visible['attractiveness'].idxmax()]
-    initial_id = top_hit['business_id']
-
-    # Was this a physical collision with a boarded up store? 
-    # Must check if closed BEFORE the journey timestamp.
-    # Note: If it closed a week AFTER the journey, the interaction is totally fine.
-    is_ghost = pd.notnull(top_hit['closure_date']) and (top_hit['closure_date'] < j_datetime)
+        # User makes initial decision
+        top = attractiveness.argmax()
+        initial_id = candidate_index.business_id[visible_rows[top]]
+
+        # Was this a physical collision with a boarded up store? 
+        # Must check if closed BEFORE the journey timestamp.
+        # Note: If it closed a week AFTER the journey, the interaction is totally fine.
+        is_ghost = candidate_index.closed_before(visible_rows[top], j_datetime)
     
-    actual_spend = 0.0
-    final_id = None
-    ghost_flag_code = 0
-    search_fatigue = False
+        actual_spend = 0.0
+        final_id = None
+        ghost_flag_code = 0
+        search_fatigue = False
     
-    if is_ghost:
-        ghost_flag_code = 1
-        # The Ghost routing protocol: User bounces off a locked door. Do they find another place?
-        # Fatgue dictates a 40% rage-quit drop-off metric. (Total Revenue Ecosystem Bleed)
-        if random.random() < 0.40:
-            search_fatigue = True
-            # Leaked entirely
-        else:
-            # We look for the NEXT best. Note: System glitch... sometimes they bounce to ANOTHER closed store.
-            df_visible_rest = df_visible.drop(top_hit.name)
-            if not df_visible_rest.empty:
-                bounce_hit = df_visible_rest.loc[df_visible_rest['attractiveness'].idxmax()]
+        if is_ghost:
+            ghost_flag_code = 1
+            # The Ghost routing protocol: User bounces off a locked door. Do they find another place?
+            # Fatgue dictates a 40% rage-quit drop-off metric. (Total Revenue Ecosystem Bleed)
+            if random.random() < RAGE_QUIT_PROBABILITY:
+                search_fatigue = True
+                # Leaked entirely
+            else:
+                # We look for the NEXT best. Note: System glitch... sometimes they bounce to ANOTHER closed store.
+                if len(visible_rows) > 1:
+                    attractiveness[top] = -np.inf
+                    bounce = attractiveness.argmax()
                 
-                is_bounce_ghost = pd.notnull(bounce_hit['closure_date']) and (bounce_hit['closure_date'] < j_datetime)
-                if not is_bounce_ghost:
-                    # Successfully navigated
-                    final_id = bounce_hit['business_id']
-                    # Rage penalty on wallet
-                    actual_spend = max(1.00, planned_spend * random.uniform(0.6, 0.95))
-                else:
-                    search_fatigue = True # Double-fail, always yields rage quit.
-    else:
-        # Standard clean transactional operation
-        final_id = initial_id
-        actual_spend = planned_spend
+                    is_bounce_ghost = candidate_index.closed_before(visible_rows[bounce], j_datetime)
+                    if not is_bounce_ghost:
+                        # Successfully navigated
+                        final_id = candidate_index.business_id[visible_rows[bounce]]
+                        # Rage penalty on wallet
+                        actual_spend = max(1.00, planned_spend * random.uniform(0.6, 0.95))
+                    else:
+                        search_fatigue = True # Double-fail, always yields rage quit.
+        else:
+            # Standard clean transactional operation
+            final_id = initial_id
+            actual_spend = planned_spend
 
     
-    # Determine absolute system damage metrics
-    leaked_funds = 0.0 if not search_fatigue else planned_spend
+        # Determine absolute system damage metrics
+        leaked_funds = 0.0 if not search_fatigue else planned_spend
+
+        # Compile analytical footprint
+        journey = {
+            'journey_id': f'JNY-{100000+i:07d}',
+            'user_cookie': f"U_{''.join(random.choices('0123456789ABCDEF', k=12))}",
+            'platform': platform,
+            'journey_timestamp': j_datetime.isoformat(timespec='seconds'),
+            'client_lat_origin': round(c_lat, 6),
+            'client_lon_origin': round(c_lon, 6),
+            'search_category': search_cat,
+            'distance_driven_km': round(distance_km[top], 2),
+            'intended_biz_target': initial_id,
+            'ghost_collision_event': ghost_flag_code,
+            'rage_quit_dropoff': 1 if search_fatigue else 0,
+            'final_visited_biz': final_id if pd.notna(final_id) else None,
+            'economic_transaction_value': round(actual_spend, 2),
+            'ecosystem_value_leaked': round(leaked_funds, 2)
+        }
+        journeys_list.append(journey)
+
+    df_journeys = journeys_list.to_frame()
+    generation.stop(rows=len(df_journeys))
 
     # Insert noise directly on device coordinates occasionally simulating GPS / Telemetry lag
-    record_lat = c_lat if random.random() < 0.98 else np.nan
-    record_lon = c_lon if random.random() < 0.98 else np.nan
-    
-    # Compile analytical footprint
-    journey = {
-        'journey_id': f'JNY-{100000+i:07d}',
-        'user_cookie': f"U_{''.join(random.choices('0123456789ABCDEF', k=12))}",
-        'platform': platform if random.random() < 0.99 else np.nan,
-        'journey_timestamp': j_datetime.isoformat(timespec='seconds'),
-        'client_lat_origin': round(record_lat, 6) if pd.notnull(record_lat) else record_lat,
-        'client_lon_origin': round(record_lon, 6) if pd.notnull(record_lon) else record_lon,
-        'search_category': search_cat,
-        'distance_driven_km': round(top_hit['distance_km'], 2),
-        'intended_biz_target': initial_id,
-        'ghost_collision_event': ghost_flag_code,
-        'rage_quit_dropoff': 1 if search_fatigue else 0,
-        'final_visited_biz': final_id if pd.notna(final_id) else None,
-        'economic_transaction_value': round(actual_spend, 2),
-        'ecosystem_value_leaked': round(leaked_funds, 2)
-    }
-    journeys_list.append(journey)
+    # (the vectorized engine draws the same noise inside its blocks)
+    with span('noise injection', rows=len(df_journeys)):
+        df_journeys = apply_noise(df_journeys, TELEMETRY_NOISE, noise_rng)
 
 # --- Output Pipeline and Degradation Simulation ---
 print("[*] Formatting systemic boundaries...")
 
-df_journeys = pd.DataFrame(journeys_list)
+# Data Normalization Friction (Inject formatting inconsistency typical of legacy databases):
+# remove standard 'T' from iso formatting natively to irritate parsers later
+with span('noise injection', rows=len(df_journeys)):
+    df_journeys = apply_noise(df_journeys, TIMESTAMP_NOISE, noise_rng)
 
-# Data Normalization Friction (Inject formatting inconsistency typical of legacy databases)
-def temporal_skew(dt_str):
-    if pd.isnull(dt_str): return dt_str
-    if random.random() < 0.05:
-        # Remove standard 'T' from iso formatting natively to irritate parsers later
-        return dt_str.replace("T", " ")
-    return dt_str
-
-df_journeys['journey_timestamp'] = df_journeys['journey_timestamp'].apply(temporal_skew)
+# Compact column types (schema.py) for the rest of the run; the saved values don't change
+print(schema_report({'journeys': df_journeys}).to_string())
+df_journeys = apply_schema(df_journeys, 'journeys')
 
 # Output operation
-df_journeys.to_csv(OUTPUT_FILENAME, index=False)
+with span('write', rows=len(df_journeys)):
+    write_table(df_journeys, OUTPUT_FILENAME, OUTPUT_FORMAT)
 
 # --- Executive Audit / QA Analytics ---
 print(f"\n[+] Processing Phase Finished. Yielded {len(df_journeys)} simulated traces to '{OUTPUT_FILENAME}'.")
@@ -234,9 +246,13 @@ print(f"[-] Ghost Interaction Incident Volume: {collision_rate:.1f}% of total se
 print(f"[-] Post-Collision Abandonment (Rage-Quit) Profile: {abandonment_rate:.1f}%")
 
 print("\n[-] Spend Anomalies (Min/Max vs Category Bounds):")
-metrics = df_journeys.groupby('search_category')['economic_transaction_value'].agg(['mean', 'max', lambda x: x[x>0].min()])
+metrics = df_journeys.groupby('search_category', observed=True)['economic_transaction_value'].agg(['mean', 'max', lambda x: x[x>0].min()])
 metrics.rename(columns={'mean': 'Average Basket', 'max': 'High-Roller Check', '<lambda_0>': 'Floor Value'}, inplace=True)
 print(metrics.round(2))
 
 telemetry_loss = df_journeys['client_lat_origin'].isna().sum()
 print(f"\n[!] Log Pipeline Notice: Caught {telemetry_loss} client connections missing payload telemetry coordinates.")
+
+if candidate_cache is not None:
+    cache_stats = candidate_cache.stats()
+    print(f"[-] Candidate Cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses ({cache_stats['hit_rate']:.1%} hit rate, {cache_stats['entries']} cells held).")
@@ -0,0 +1,295 @@
+"""
+Vectorized columnar engine for the business simulation.
+
+`1. Businesses.py` builds one business at a time. That is the readable reference
+for the guardrails, but at load-test sizes (5-50 million businesses) the per-row
+Python loop takes hours. This engine draws every guardrail as a whole NumPy
+column instead (economic index, cluster coordinates, chain flags, category bias,
+hazard-based closure, pareto popularity, lognormal revenue, the rating/review
+count link and the typo/missing-field noise) and produces the same statistical
+shape, not the same rows.
+
+Throughput target: THROUGHPUT_TARGET_ROWS_PER_SEC (1,000,000 businesses/sec on a
+single core). A 5M row run should finish in seconds, not hours.
+"""
+import sys
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from pathlib import Path
+
+from schema import apply_schema
+from table_io import write_table
+
+# Shared helpers live in Shared/ at the repository root
+sys.path.append(str(Path(__file__).resolve().parents[2] / 'Shared'))
+from faker_pool import FakerPool
+
+THROUGHPUT_TARGET_ROWS_PER_SEC = 1_000_000
+
+# Streaming mode writes one part file per chunk, so this sets peak memory
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+START_DATE = datetime(2010, 1, 1) # Earlier start date to allow history
+
+# Base Definitions
+CATEGORIES =['Cafe', 'Restaurant', 'Bookstore', 'Electronics Store', 'Clothing Store', 'Bar', 'Bakery', 'Gym']
+CHAIN_NAMES = ['Star Coffee', 'QuickMart', 'FitZone', 'Burger King', 'TechHub', 'Urban Cafe']
+
+# Category location biases (Guardrail 9)
+CATEGORY_WEIGHTS = {
+    "Downtown":['Cafe', 'Restaurant', 'Bar', 'Bakery'],
+    "Midtown":['Electronics Store', 'Clothing Store', 'Restaurant', 'Gym'],
+    "Suburbia":['Gym', 'Bookstore', 'Cafe', 'Clothing Store']
+}
+
+CITY_CENTERS = {
+    "Downtown":    {'lat': 40.7128, 'lon': -74.0060, 'scale': 0.05}, # Dense
+    "Midtown":     {'lat': 34.0522, 'lon': -118.2437, 'scale': 0.08},
+    "Suburbia":    {'lat': 41.8781, 'lon': -87.6298, 'scale': 0.20}  # Sparse
+}
+
+# Older businesses skew traditional (Guardrail 16)
+TRADITIONAL_CATEGORIES = ['Bookstore', 'Bakery', 'Cafe']
+
+# Guardrail 1: IDs are drawn from BIZ-10000 .. BIZ-99999
+ID_LOW, ID_HIGH = 10000, 100000
+
+PANDEMIC_START = datetime(2020, 3, 1)
+PANDEMIC_END = datetime(2021, 12, 31)
+
+# Faker is far too slow to call per row at scale, so independent businesses draw
+# their names from a seeded pool built from this many company names (see Shared/faker_pool.py).
+COMPANY_NAME_POOL_SIZE = 20000
+
+
+def company_name_pool(size=COMPANY_NAME_POOL_SIZE, seed=42):
+    """Seeded list of distinct Faker company names shared by every independent business, cached on disk."""
+    names, _ = FakerPool(seed=seed, size=size).values('company')
+    return names.tolist()
+
+
+def _name_variants(names):
+    """Expands each name into its 6 noise variants: (as-is, lower, upper) x (intact, dropped last letter)."""
+    variants = []
+    for name in names:
+        for cased in (name, name.lower(), name.upper()):
+            variants.append(cased)
+            variants.append(cased[:-1] if len(cased) > 3 else cased)
+    return variants
+
+
+def _business_id_table():
+    """All 90,000 possible 'BIZ-xxxxx' strings, so IDs are formatted by lookup instead of per row."""
+    return np.array([f"BIZ-{i}" for i in range(ID_LOW, ID_HIGH)], dtype=object)
+
+
+def generate_businesses(num_businesses, seed=42, today=None, name_pool=None):
+    """Builds the business table column by column. Mirrors the guardrails of `1. Businesses.py`."""
+    chunks = list(iter_business_chunks(num_businesses, chunk_size=max(num_businesses, 1), seed=seed, today=today, name_pool=name_pool))
+    return chunks[0] if chunks else pd.DataFrame()
+
+
+def iter_business_chunks(num_businesses, chunk_size=DEFAULT_CHUNK_SIZE, seed=42, today=None, name_pool=None):
+    """
+    Yields the business table in chunks of at most `chunk_size` rows.
+
+    Only two pieces of state cross chunk boundaries, and both have a fixed size:
+    a count of every ID issued so far (Guardrail 2 draws duplicates from the
+    whole history, not just the current chunk) and the last freshly placed
+    location (Guardrail 11). Peak memory is therefore set by `chunk_size`, not
+    by `num_businesses`.
+    """
+    rng = np.random.default_rng(seed)
+    today = today or datetime.now()
+    name_pool = name_pool if name_pool is not None else company_name_pool(seed=seed)
+
+    variant_codes, variant_names = pd.factorize(np.array(_name_variants(CHAIN_NAMES + list(name_pool)), dtype=object))
+    tables = {
+        'business_ids': _business_id_table(),
+        'name_pool_size': len(name_pool),
+        'name_variants': variant_names[variant_codes],
+    }
+    state = {
+        'id_counts': np.zeros(ID_HIGH - ID_LOW, dtype=np.int64),
+        'previous_location': None,
+    }
+    for start in range(0, num_businesses, chunk_size):
+        yield _generate_chunk(rng, min(chunk_size, num_businesses - start), today, tables, state)
+
+
+def write_business_parts(num_businesses, output_dir, chunk_size=DEFAULT_CHUNK_SIZE, seed=42, today=None, fmt='csv'):
+    """
+    Streams the business table to `output_dir` as one part-NNNNN.csv (or .parquet)
+    per chunk, each converted to the compact schema (schema.py) first. Returns the
+    part paths.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for stale in output_dir.glob('part-*.*'): # An earlier run with more chunks would leave extra parts behind
+        if stale.suffix in ('.csv', '.parquet'):
+            stale.unlink()
+    paths = []
+    for i, chunk in enumerate(iter_business_chunks(num_businesses, chunk_size=chunk_size, seed=seed, today=today)):
+        paths.append(write_table(apply_schema(chunk, 'businesses'), output_dir / f"part-{i:05d}", fmt))
+    return paths
+
+
+def _generate_chunk(rng, n, today, tables, state):
+    """Generates `n` businesses, reading and updating the cross-chunk `state` in place."""
+    centers = list(CITY_CENTERS.keys())
+    center_lat = np.array([CITY_CENTERS[c]['lat'] for c in centers])
+    center_lon = np.array([CITY_CENTERS[c]['lon'] for c in centers])
+    center_scale = np.array([CITY_CENTERS[c]['scale'] for c in centers])
+
+    # Dates are handled as integer day offsets from START_DATE until the very end
+    horizon = (today - START_DATE).days
+    day_2015 = (datetime(2015, 1, 1) - START_DATE).days
+    pandemic_start = (PANDEMIC_START - START_DATE).days
+    pandemic_end = (PANDEMIC_END - START_DATE).days
+
+    # --- 5. STATISTICAL STRUCTURE: Hidden Variables ---
+    # Guardrail 22 (Hidden Stat): Latent Economic Index
+    economic_index = rng.standard_normal(n)
+
+    # --- 1. IDENTITY & RECORD INTEGRITY ---
+    # Guardrail 1: Non-sequential, partially structured IDs
+    id_numbers = rng.integers(ID_LOW, ID_HIGH, size=n)
+
+    # Guardrail 2: Occasional duplicate IDs, copied from any earlier non-duplicate row.
+    # Earlier chunks are represented by their ID counts, this chunk by its own rows.
+    id_counts = state['id_counts']
+    issued_before = int(id_counts.sum())
+    is_dup = rng.random(n) < 0.01
+    if issued_before == 0:
+        is_dup[:1] = False
+    originals = np.flatnonzero(~is_dup)
+    originals_before = np.cumsum(~is_dup)[is_dup]
+    picks = rng.random(len(originals_before)) * (issued_before + originals_before)
+    from_history = picks < issued_before
+    dup_ids = np.empty(len(picks), dtype=id_numbers.dtype)
+    dup_ids[from_history] = ID_LOW + np.searchsorted(np.cumsum(id_counts), picks[from_history], side='right')
+    dup_ids[~from_history] = id_numbers[originals[(picks[~from_history] - issued_before).astype(np.int64)]]
+    id_numbers[is_dup] = dup_ids
+    id_counts += np.bincount(id_numbers[originals] - ID_LOW, minlength=len(id_counts))
+
+    # --- 3. GEOGRAPHIC REALISM ---
+    center_idx = rng.integers(0, len(centers), size=n)
+
+    # Guardrail 10: Coordinate clustering with noise (Density variation)
+    scale_mod = rng.uniform(0.5, 1.5, size=n)
+    spread = center_scale[center_idx] * scale_mod
+    latitude = np.round(np.clip(rng.normal(center_lat[center_idx], spread), -90.0, 90.0), 6)
+    longitude = np.round(np.clip(rng.normal(center_lon[center_idx], spread), -180.0, 180.0), 6)
+
+    # Guardrail 11: Shared coordinates, i.e. the last freshly placed location is reused.
+    # A source row of -1 points at the last fresh location of the previous chunk.
+    shares_location = rng.random(n) < 0.1
+    if state['previous_location'] is None:
+        shares_location[:1] = False
+    source_row = np.maximum.accumulate(np.where(shares_location, -1, np.arange(n)))
+    previous_lat, previous_lon = state['previous_location'] or (np.nan, np.nan)
+    latitude = np.append(latitude, previous_lat)[source_row]
+    longitude = np.append(longitude, previous_lon)[source_row]
+    if n:
+        state['previous_location'] = (latitude[-1], longitude[-1])
+
+    # --- 4. BUSINESS BEHAVIOR & LOGIC ---
+    # Guardrail 14 & 15: Chain vs Independent logic
+    is_chain = rng.random(n) < 0.20
+    name_code = np.where(
+        is_chain,
+        rng.integers(0, len(CHAIN_NAMES), size=n),
+        len(CHAIN_NAMES) + rng.integers(0, tables['name_pool_size'], size=n)
+    )
+
+    # Guardrail 9: Location-based category bias
+    archetypes = np.array([[CATEGORIES.index(c) for c in CATEGORY_WEIGHTS[name]] for name in centers])
+    follows_archetype = rng.random(n) < 0.7
+    category_code = np.where(
+        follows_archetype,
+        archetypes[center_idx, rng.integers(0, archetypes.shape[1], size=n)],
+        rng.integers(0, len(CATEGORIES), size=n)
+    )
+
+    # --- 2. TEMPORAL REALISM ---
+    # Guardrail 4: Opening date required
+    opening_day = rng.integers(0, horizon + 1, size=n)
+    age_days = horizon - opening_day
+
+    # Guardrail 16: Category drift / Time-based Cohort Effects
+    traditional = np.array([CATEGORIES.index(c) for c in TRADITIONAL_CATEGORIES])
+    drifts = (opening_day < day_2015) & (rng.random(n) < 0.3)
+    category_code = np.where(drifts, traditional[rng.integers(0, len(traditional), size=n)], category_code)
+
+    # --- SURVIVAL ANALYSIS (Hazard Function) ---
+    # Guardrail 7 & 13: Hazard grows with age, category-specific survival rates
+    hazard_prob = np.minimum(0.0005 * age_days, 0.8)
+    hazard_prob = np.where(category_code == CATEGORIES.index('Bar'), hazard_prob * 1.5, hazard_prob)
+    hazard_prob = np.where(category_code == CATEGORIES.index('Bookstore'), hazard_prob * 0.7, hazard_prob)
+    hazard_prob = np.where(is_chain, hazard_prob * 0.4, hazard_prob)
+    hazard_prob = hazard_prob - economic_index * 0.1
+    is_closed = (age_days > 180) & (rng.random(n) < hazard_prob)
+
+    # Guardrail 5 & 6 & 8: Lifespan logic & Pandemic Spike
+    min_close_day = opening_day + 90
+    max_close_days = horizon - min_close_day
+    is_closed &= max_close_days > 0
+    closure_day = min_close_day + rng.integers(0, np.maximum(max_close_days, 0) + 1)
+
+    pandemic_start_day = np.maximum(min_close_day, pandemic_start)
+    pandemic_hit = (
+        is_closed
+        & (min_close_day < pandemic_end)
+        & (opening_day < pandemic_start)
+        & (rng.random(n) < 0.6)
+        & (pandemic_start_day < pandemic_end)
+    )
+    pandemic_day = pandemic_start_day + rng.integers(0, np.maximum(pandemic_end - pandemic_start_day, 0) + 1)
+    closure_day = np.where(pandemic_hit, pandemic_day, closure_day)
+
+    # --- 5. STATISTICAL STRUCTURE ---
+    # Guardrail 17: Heavy-tailed popularity (Power-Law)
+    popularity_score = np.round(rng.pareto(2.5, size=n) + 1, 2)
+
+    # Guardrail 18: Log-Normal Revenue Distribution
+    revenue_mean = 10 + np.where(is_chain, 0.5, 0.0) + economic_index * 0.2
+    revenue = np.round(rng.lognormal(revenue_mean, 1.2), 2)
+
+    # Guardrail 19: Review Count vs Rating Correlation
+    review_count = rng.exponential(50 * popularity_score).astype(np.int64)
+    rating_noise = rng.normal(0, np.maximum(0.1, 1.0 / np.log(review_count + 2)))
+    rating = np.where(review_count > 0, np.round(np.clip(3.8 + rating_noise, 1.0, 5.0), 1), np.nan)
+
+    # --- 6. DATA QUALITY IMPERFECTIONS ---
+    # Guardrail 21: Typographical noise & Inconsistent formats, encoded as one of 6 variants per name
+    lower = rng.random(n) < 0.05
+    upper = ~lower & (rng.random(n) < 0.05)
+    dropped = rng.random(n) < 0.05
+    variant = np.where(lower, 1, np.where(upper, 2, 0)) * 2 + dropped
+    names = tables['name_variants'][name_code * 6 + variant]
+
+    # Guardrail 20 & 12: Missing fields
+    latitude = np.where(rng.random(n) < 0.03, np.nan, latitude)
+    longitude = np.where(rng.random(n) < 0.03, np.nan, longitude)
+    category_code = np.where(rng.random(n) < 0.02, len(CATEGORIES), category_code)
+
+    start = np.datetime64(START_DATE.date(), 'D')
+    closure_date = np.where(is_closed, start + closure_day, np.datetime64('NaT'))
+
+    return pd.DataFrame({
+        'business_id': tables['business_ids'][id_numbers - ID_LOW],
+        'business_name': names,
+        'is_chain': is_chain,
+        'category': np.array(CATEGORIES + [None], dtype=object)[category_code],
+        'neighborhood': np.array(centers, dtype=object)[center_idx],
+        'latitude': latitude,
+        'longitude': longitude,
+        'opening_date': (start + opening_day).astype('datetime64[ns]'),
+        'status': np.array(['Open', 'Permanently Closed'], dtype=object)[is_closed.astype(np.int8)],
+        'closure_date': closure_date.astype('datetime64[ns]'),
+        'popularity_score': popularity_score,
+        'annual_revenue': revenue,
+        'review_count': review_count,
+        'average_rating': rating
+    })
@@ -0,0 +1,131 @@
+"""
+Fast parsing of the deliberately messy date columns the generators emit.
+
+The review dates come out as ISO dates with a few percent in the legacy
+`%Y/%m/%d` and `%m-%d-%y` formats (Guardrail 44), and journey timestamps are ISO
+with some of the `T`s swapped for a space. `pd.to_datetime(..., errors='coerce')`
+guesses one format from the first value and turns every other format into NaT,
+and format='mixed' falls back to parsing value by value.
+
+Every generated format is fixed-width, so parse_mixed_dates views a chunk of
+values as a character matrix (one uint32 column per character), picks each
+value's format from where its separators sit, and then reads the fields of each
+format group straight out of their digit columns with NumPy arithmetic.
+"""
+import numpy as np
+import pandas as pd
+
+# Every format the generators write, by name, in the order they are reported
+GENERATED_FORMATS = {
+    'iso_date': '%Y-%m-%d',
+    'iso_datetime': '%Y-%m-%dT%H:%M:%S',
+    'iso_space_datetime': '%Y-%m-%d %H:%M:%S',
+    'slash_date': '%Y/%m/%d',
+    'legacy_date': '%m-%d-%y',
+}
+
+# Values are parsed this many at a time, which bounds the character matrix
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+# Zero-padded strftime fields the parser understands, by width
+_FIELD_WIDTHS = {'Y': 4, 'y': 2, 'm': 2, 'd': 2, 'H': 2, 'M': 2, 'S': 2}
+_ZERO = ord('0')
+_DAYS_IN_MONTH = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+
+
+def parse_mixed_dates(values, formats=GENERATED_FORMATS, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Parses a column of generated dates and returns (datetime64 Series, counts).
+
+    `formats` maps names to fixed-width strftime formats built from %Y %y %m %d
+    %H %M %S and literal characters. `counts` has the number of values parsed in
+    each format, plus 'missing' for empty values and 'unrecognized' for anything
+    else (or values whose fields don't form a real date); both come back as NaT.
+    """
+    layouts = {name: _layout(fmt) for name, fmt in formats.items()}
+    values = pd.Series(values)
+    counts = dict.fromkeys(list(formats) + ['missing', 'unrecognized'], 0)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        counts['missing'] = int(values.isna().sum())
+        return values, pd.Series(counts)
+
+    raw = values.to_numpy(dtype=object)
+    parsed = np.full(len(raw), np.datetime64('NaT'), dtype='datetime64[ns]')
+    width = max(layout[2] for layout in layouts.values()) + 1 # One more, to see where each value ends
+    for start in range(0, len(raw), chunk_size):
+        chunk = raw[start:start + chunk_size]
+        missing = pd.isna(chunk)
+        # Fixed-width UTF-32 view: zero past the end of each value
+        chars = np.where(missing, '', chunk).astype(f'U{width}').view(np.uint32).reshape(len(chunk), width)
+        matched = missing.copy()
+        for name, layout in layouts.items():
+            rows, stamps = _parse_group(chars, ~matched, layout)
+            parsed[start + rows] = stamps
+            matched[rows] = True
+            counts[name] += len(rows)
+        counts['missing'] += int(missing.sum())
+        counts['unrecognized'] += int((~matched).sum())
+    return pd.Series(parsed, index=values.index, name=values.name), pd.Series(counts)
+
+
+def _layout(fmt):
+    """({directive: (position, width)}, [(position, character code)], total width) of a fixed-width format."""
+    fields, literals, position, i = {}, [], 0, 0
+    while i < len(fmt):
+        if fmt[i] == '%':
+            directive = fmt[i + 1:i + 2]
+            if directive not in _FIELD_WIDTHS:
+                raise ValueError(f"Unsupported directive '%{directive}' in '{fmt}'; use only {sorted(_FIELD_WIDTHS)}.")
+            fields[directive] = (position, _FIELD_WIDTHS[directive])
+            position += _FIELD_WIDTHS[directive]
+            i += 2
+        else:
+            literals.append((position, ord(fmt[i])))
+            position += 1
+            i += 1
+    return fields, literals, position
+
+
+def _parse_group(chars, candidates, layout):
+    """Rows of `chars` (among `candidates`) that are valid in `layout`, and their datetime64[ns] values."""
+    fields, literals, width = layout
+    # Checked on the remaining candidates only: after the main format has matched, few are left
+    rows = np.flatnonzero(candidates)
+    shape = (chars[rows, width] == 0) & (chars[rows, width - 1] != 0)
+    for position, code in literals:
+        shape &= chars[rows, position] == code
+    rows = rows[shape]
+    # Unsigned, so characters below '0' wrap around and fail the <= 9 check too
+    digits = chars[rows, :width] - np.uint32(_ZERO)
+    positions = np.concatenate([np.arange(position, position + size) for position, size in fields.values()])
+    valid = digits[:, positions].max(axis=1) <= 9
+
+    number = {}
+    for directive, (position, size) in fields.items():
+        number[directive] = sum(digits[:, position + k].astype(np.int64) * 10 ** (size - 1 - k) for k in range(size))
+
+    if 'y' in number:
+        # strptime's pivot: 69-99 are the 1900s, 00-68 the 2000s
+        number['Y'] = np.where(number['y'] >= 69, 1900, 2000) + number['y']
+    year, month, day = number['Y'], number['m'], number['d']
+    leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    month_days = _DAYS_IN_MONTH[np.clip(month, 1, 12) - 1] + ((month == 2) & leap)
+    valid &= (month >= 1) & (month <= 12) & (day >= 1) & (day <= month_days)
+
+    seconds = np.zeros(len(rows), dtype=np.int64)
+    for directive, limit, scale in (('H', 24, 3600), ('M', 60, 60), ('S', 60, 1)):
+        if directive in number:
+            valid &= number[directive] < limit
+            seconds += number[directive] * scale
+    stamps = (_days_since_epoch(year, month, day) * 86_400 + seconds) * 10**9
+    return rows[valid], stamps[valid].view('datetime64[ns]')
+
+
+def _days_since_epoch(year, month, day):
+    """Days from 1970-01-01 to a proleptic Gregorian date, as plain integer arithmetic (years counted from March)."""
+    year = year - (month <= 2)
+    era = year // 400
+    year_of_era = year - era * 400
+    day_of_year = (153 * ((month + 9) % 12) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    return era * 146_097 + day_of_era - 719_468
@@ -0,0 +1,486 @@
+"""
+Candidate search index for the customer journey simulation.
+
+For every journey `3. Customer Journey.py` masks the whole business table by category,
+computes the distance to every match and only then drops the ones over 100 km, so
+each journey costs O(businesses). CandidateIndex buckets each category's businesses
+into a lat/lon grid once. A query only reads the cells that overlap the search
+radius, so its cost depends on how many businesses are nearby, and it returns
+exactly the businesses the full scan would have kept, in the same (table) order.
+
+The index is also temporal. Inside every cell businesses are sorted by opening date,
+so "already open at the journey date" is a bisect per cell instead of a boolean scan
+and DataFrame copy, and closure dates sit in an aligned int64 array, so the ghost
+status of a candidate is a single comparison.
+
+On top of the index, simulate_journeys runs the whole journey model in blocks of
+thousands: timestamps, categories, platforms, origins, spend and cookies are drawn
+as arrays, journeys that share a category and origin cell are scored together as a
+(journeys x candidates) matrix, and the best and second-best candidate come from
+one argpartition. Ghost collisions, rage-quits and bounce spend are then masks.
+The output has the same columns and distributions as the loop in
+`3. Customer Journey.py` (before its timestamp skew), not the same rows.
+
+CandidateCache optionally memoizes cell candidate sets per (category, origin cell,
+time bucket) with LRU eviction, for workloads where many journeys share a
+neighborhood, category and month.
+"""
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+
+from noise import DateFormats
+from datetime import datetime
+
+EARTH_RADIUS_KM = 6371      # Radius of Earth in kilometers
+SEARCH_RADIUS_KM = 100      # Customers ignore anything further away
+DEFAULT_CELL_DEG = 0.5      # Grid cell size in degrees (~55 km of latitude)
+
+MIN_HISTORY_YEARS = 5
+
+# Demand Power-Laws (Weighted likelihood of someone searching for this category)
+CATEGORY_DEMAND_WEIGHTS = {
+    'Restaurant': 35,
+    'Cafe': 25,
+    'Clothing Store': 10,
+    'Bar': 12,
+    'Bakery': 8,
+    'Gym': 5,
+    'Bookstore': 3,
+    'Electronics Store': 2
+}
+
+# Lognormal Baseline spend params (Mean, Sigma) to replace flat assumptions
+# Real economies feature heavily skewed spend variations
+SPEND_BASE = {
+    'Cafe': (np.log(14.0), 0.6),
+    'Restaurant': (np.log(45.0), 0.8),
+    'Bookstore': (np.log(25.0), 0.5),
+    'Electronics Store': (np.log(150.0), 1.1),
+    'Clothing Store': (np.log(75.0), 0.9),
+    'Bar': (np.log(40.0), 0.7),
+    'Bakery': (np.log(12.0), 0.4),
+    'Gym': (np.log(20.0), 0.3) 
+}
+
+# Realistic Telemetry metadata sources
+SEARCH_PLATFORMS =['iOS Maps', 'Android Google Maps', 'Web Search Desktop', 'Web Search Mobile', 'Direct Link']
+PLATFORM_WEIGHTS = [40, 35, 10, 10, 5]
+
+# Fatigue dictates a 40% rage-quit drop-off after hitting a boarded up store
+RAGE_QUIT_PROBABILITY = 0.40
+
+# The script's timestamp skew (see noise.py): 5% of journeys lose the ISO 'T', as legacy
+# databases write them. simulate_journeys leaves timestamps clean; callers apply this after
+TIMESTAMP_NOISE = [DateFormats('journey_timestamp', {'%Y-%m-%d %H:%M:%S': 0.05}, default='%Y-%m-%dT%H:%M:%S')]
+
+DAY_NS = 86_400 * 10**9
+
+# Journeys per block in simulate_journeys, and the largest (journeys x candidates)
+# matrix scored at once. Together they bound the working memory.
+DEFAULT_BLOCK_SIZE = 8192
+MAX_BLOCK_PAIRS = 4_000_000
+
+# CandidateCache defaults: cached cell candidate sets, and the width of a time bucket
+DEFAULT_CACHE_SIZE = 4096
+DEFAULT_BUCKET_DAYS = 30
+
+JOURNEY_COLUMNS = [
+    'journey_id', 'user_cookie', 'platform', 'journey_timestamp', 'client_lat_origin', 'client_lon_origin',
+    'search_category', 'distance_driven_km', 'intended_biz_target', 'ghost_collision_event',
+    'rage_quit_dropoff', 'final_visited_biz', 'economic_transaction_value', 'ecosystem_value_leaked'
+]
+
+_HEX_DIGITS = np.frombuffer(b'0123456789ABCDEF', dtype=np.uint8)
+
+
+def haversine_km(lat1, lon1, lat_arr, lon_arr):
+    """Calculates array-based distances instantly."""
+    dLat = np.radians(lat_arr - lat1)
+    dLon = np.radians(lon_arr - lon1)
+    a = np.sin(dLat / 2)**2 + np.cos(np.radians(lat1)) * np.cos(np.radians(lat_arr)) * np.sin(dLon / 2)**2
+    return EARTH_RADIUS_KM * (2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a)))
+
+
+class CandidateIndex:
+    """
+    Per-category grid over business coordinates and opening dates.
+
+    Within a category, businesses are sorted by cell key (latitude band first, then
+    longitude) and then by opening date, so the cells of one latitude band that
+    overlap the search box are one contiguous run, and each cell's "opened by t"
+    businesses are a prefix of its slice. Businesses without a category,
+    coordinates or opening date are left out: the full scan never keeps them
+    either (NaN distances and NaT dates fail every comparison).
+
+    `business_id`, `rating`, `opening_ns` and `closure_ns` are aligned with the
+    rows of the table the index was built from. Missing closure dates are stored
+    as the largest int64, so they never count as closed.
+    """
+
+    def __init__(self, df_biz, cell_deg=DEFAULT_CELL_DEG, radius_km=SEARCH_RADIUS_KM):
+        self.cell_deg = cell_deg
+        self.radius_km = radius_km
+        self.business_id = df_biz['business_id'].to_numpy(dtype=object)
+        self.rating = df_biz['average_rating'].to_numpy(dtype=float)
+        self.latitude = df_biz['latitude'].to_numpy(dtype=float)
+        self.longitude = df_biz['longitude'].to_numpy(dtype=float)
+        opening = df_biz['opening_date'].to_numpy(dtype='datetime64[ns]')
+        closure = df_biz['closure_date'].to_numpy(dtype='datetime64[ns]')
+        self.opening_ns = opening.view(np.int64)
+        self.closure_ns = np.where(np.isnat(closure), np.iinfo(np.int64).max, closure.view(np.int64))
+        self._lat_cells = int(np.ceil(180 / cell_deg)) + 1
+        self._lon_cells = int(np.ceil(360 / cell_deg)) + 1
+
+        category = df_biz['category'].to_numpy(dtype=object)
+        indexed = ~np.isnan(self.latitude) & ~np.isnan(self.longitude) & ~np.isnat(opening) & pd.notna(category)
+        self._categories = {}
+        self._timelines = {}
+        for cat in pd.unique(category[indexed]):
+            rows = np.flatnonzero(indexed & (category == cat))
+            keys = self._lat_cell(self.latitude[rows]) * self._lon_cells + self._lon_cell(self.longitude[rows])
+            order = np.lexsort((rows, self.opening_ns[rows], keys))
+            cells, starts = np.unique(keys[order], return_index=True)
+            self._categories[cat] = (rows[order], cells, np.r_[starts, len(rows)], self.opening_ns[rows[order]])
+
+            by_opening = rows[np.argsort(self.opening_ns[rows], kind='stable')]
+            self._timelines[cat] = (by_opening, self.opening_ns[by_opening])
+
+    def visible(self, category, when):
+        """Rows of `category` already open at `when`, in opening order (a view, not a copy)."""
+        if category not in self._timelines:
+            return np.empty(0, dtype=np.int64)
+        rows, opening = self._timelines[category]
+        return rows[:np.searchsorted(opening, _to_ns(when), side='right')]
+
+    def closed_before(self, rows, when):
+        """Whether the businesses at `rows` had closed before `when` (ghost status)."""
+        return self.closure_ns[rows] < _to_ns(when)
+
+    def cell_keys(self, lat, lon):
+        """Grid cell of each (lat, lon) point, as one int64 key."""
+        return self._lat_cell(lat) * self._lon_cells + self._lon_cell(lon)
+
+    def cell_candidates(self, category, cell_key, when=None):
+        """
+        Rows of `category` that can be within the search radius of some point of
+        cell `cell_key` (and open at `when`), with their distances to the cell center.
+
+        Measured from the center, any point of the cell is at most `reach` km away, so
+        by the triangle inequality this is a superset of every `query()` made from
+        inside the cell. Callers still apply the exact distance cut per journey.
+        """
+        lat_cell, lon_cell = divmod(int(cell_key), self._lon_cells)
+        lat = -90 + (lat_cell + 0.5) * self.cell_deg
+        lon = -180 + (lon_cell + 0.5) * self.cell_deg
+        half = self.cell_deg / 2
+        corners_lat = np.clip([lat - half, lat - half, lat + half, lat + half], -90, 90)
+        corners_lon = np.array([lon - half, lon + half, lon - half, lon + half])
+        reach = haversine_km(lat, lon, corners_lat, corners_lon).max() * 1.01 + 1e-3
+        return self.query(category, lat, lon, when, radius_km=self.radius_km + reach)
+
+    def _lat_cell(self, lat):
+        return np.clip(np.floor((np.asarray(lat) + 90) / self.cell_deg), 0, self._lat_cells - 1).astype(np.int64)
+
+    def _lon_cell(self, lon):
+        return np.clip(np.floor((np.asarray(lon) + 180) / self.cell_deg), 0, self._lon_cells - 1).astype(np.int64)
+
+    def query(self, category, lat, lon, when=None, radius_km=None):
+        """
+        Rows of `category` strictly within `radius_km` of (lat, lon) and, if `when`
+        is given, already open at that time. Rows come back in table order,
+        together with their distances in km.
+        """
+        radius_km = self.radius_km if radius_km is None else radius_km
+        entry = self._categories.get(category)
+        if entry is None or np.isnan(lat) or np.isnan(lon):
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        rows, cells, bounds, opening = entry
+        when_ns = None if when is None else _to_ns(when)
+
+        slices = []
+        for a, b in self._cell_slices(cells, lat, lon, radius_km):
+            if when_ns is None:
+                slices.append(rows[bounds[a]:bounds[b]])
+                continue
+            for start, stop in zip(bounds[a:b], bounds[a + 1:b + 1]):
+                slices.append(rows[start:start + np.searchsorted(opening[start:stop], when_ns, side='right')])
+        near = np.sort(np.concatenate(slices)) if slices else np.empty(0, dtype=np.int64)
+        distances = haversine_km(lat, lon, self.latitude[near], self.longitude[near])
+        keep = distances < radius_km
+        return near[keep], distances[keep]
+
+    def _cell_slices(self, cells, lat, lon, radius_km):
+        """(start, stop) positions in `cells` of every cell overlapping the search box."""
+        # Bounding box of the search circle. The great-circle distance is never
+        # shorter than the latitude difference, and the longitude half-width is exact
+        # unless the circle reaches a pole. A hair of slack covers rounding.
+        angle = radius_km / EARTH_RADIUS_KM
+        d_lat = np.degrees(angle) + 1e-6
+        lat_lo, lat_hi = self._lat_cell([lat - d_lat, lat + d_lat])
+        if np.cos(np.radians(lat)) > np.sin(angle):
+            d_lon = np.degrees(np.arcsin(np.sin(angle) / np.cos(np.radians(lat)))) + 1e-6
+        else:
+            d_lon = 360
+        if lon - d_lon < -180 or lon + d_lon > 180:
+            lon_lo, lon_hi = 0, self._lon_cells - 1 # Wraps around the antimeridian: take the whole band
+        else:
+            lon_lo, lon_hi = self._lon_cell([lon - d_lon, lon + d_lon])
+
+        for band in range(lat_lo, lat_hi + 1):
+            start = np.searchsorted(cells, band * self._lon_cells + lon_lo, side='left')
+            stop = np.searchsorted(cells, band * self._lon_cells + lon_hi, side='right')
+            if stop > start:
+                yield start, stop
+
+
+class CandidateCache:
+    """
+    Bounded LRU cache of cell candidate sets, keyed by (category, cell, time bucket).
+
+    An entry holds the candidate rows of a cell that were open by the end of the
+    bucket, with their ids, coordinates, ratings, opening and closure dates and
+    their distance to the cell center. Journeys only add the exact distance and
+    opening-date cut on top, so `query()` returns exactly what
+    `CandidateIndex.query()` would. `hits` and `misses` count lookups, to help
+    tune the index cell size and `bucket_days` to a workload.
+    """
+
+    def __init__(self, index, maxsize=DEFAULT_CACHE_SIZE, bucket_days=DEFAULT_BUCKET_DAYS):
+        self.index = index
+        self.maxsize = maxsize
+        self.bucket_ns = bucket_days * DAY_NS
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def candidates(self, category, cell_key, when):
+        """The cached candidate arrays of `cell_key` for the time bucket holding `when`."""
+        bucket = _to_ns(when) // self.bucket_ns
+        key = (category, int(cell_key), int(bucket))
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry
+
+        self.misses += 1
+        index = self.index
+        rows, centroid_km = index.cell_candidates(category, cell_key, (bucket + 1) * self.bucket_ns - 1)
+        entry = {
+            'rows': rows,
+            'business_id': index.business_id[rows],
+            'latitude': index.latitude[rows],
+            'longitude': index.longitude[rows],
+            'rating': index.rating[rows],
+            'opening_ns': index.opening_ns[rows],
+            'closure_ns': index.closure_ns[rows],
+            'centroid_km': centroid_km,
+        }
+        self._entries[key] = entry
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return entry
+
+    def query(self, category, lat, lon, when):
+        """Same contract as `CandidateIndex.query()` (with `when`), served from the cache."""
+        if np.isnan(lat) or np.isnan(lon):
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        entry = self.candidates(category, self.index.cell_keys(lat, lon), when)
+        distances = haversine_km(lat, lon, entry['latitude'], entry['longitude'])
+        keep = (distances < self.index.radius_km) & (entry['opening_ns'] <= _to_ns(when))
+        return entry['rows'][keep], distances[keep]
+
+    def stats(self):
+        """Hit/miss counters and the current number of cached entries."""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': len(self._entries),
+        }
+
+
+def simulate_journeys(index, num_journeys, rng, today=None, block_size=DEFAULT_BLOCK_SIZE, **knobs):
+    """
+    Simulates `num_journeys` customer journeys against a CandidateIndex.
+
+    Journeys with no business in reach are dropped, but keep their slot in the
+    JNY- numbering just like the loop. `knobs` are passed to iter_journey_blocks,
+    e.g. rage_quit_probability=0.6.
+    """
+    blocks = list(iter_journey_blocks(index, num_journeys, rng, today, block_size, **knobs))
+    if not blocks:
+        return pd.DataFrame(columns=JOURNEY_COLUMNS)
+    return pd.concat(blocks, ignore_index=True)
+
+
+def iter_journey_blocks(index, num_journeys, rng, today=None, block_size=DEFAULT_BLOCK_SIZE,
+                        category_weights=None, rage_quit_probability=RAGE_QUIT_PROBABILITY, cache=None):
+    """
+    Yields journeys as DataFrames of at most `block_size` rows, so runs far larger
+    than memory can be streamed to disk. `category_weights` overrides
+    CATEGORY_DEMAND_WEIGHTS. With a CandidateCache as `cache`, candidate sets are
+    reused across blocks; the journeys come out exactly as without it.
+    """
+    today_ns = _to_ns(today or datetime.now())
+    category_weights = category_weights or CATEGORY_DEMAND_WEIGHTS
+    categories = list(category_weights)
+    context = {
+        'today_ns': today_ns,
+        'categories': np.array(categories, dtype=object),
+        'category_p': _probabilities(list(category_weights.values())),
+        'platform_p': _probabilities(PLATFORM_WEIGHTS),
+        'spend_mu': np.array([SPEND_BASE[cat][0] for cat in categories]),
+        'spend_sigma': np.array([SPEND_BASE[cat][1] for cat in categories]),
+        # We establish global coordinates to ensure customer starts inside viable geometry
+        'avg_lat': np.nanmean(index.latitude),
+        'avg_lon': np.nanmean(index.longitude),
+        'rage_quit_probability': rage_quit_probability,
+        'cache': cache,
+    }
+    for start in range(0, num_journeys, block_size):
+        yield _journey_block(index, rng, start, min(block_size, num_journeys - start), context)
+
+
+def _probabilities(weights):
+    weights = np.asarray(weights, dtype=float)
+    return weights / weights.sum()
+
+
+def _journey_block(index, rng, start, n, context):
+    # 1. Establish the Timestamp of each Journey. History stretches back dynamically.
+    days_back = (rng.beta(2, 5, size=n) * (MIN_HISTORY_YEARS * 365)).astype(np.int64)
+    j_ns = context['today_ns'] - days_back * DAY_NS
+
+    # 2. Emulate the Need & The Demographic constraint, plus platform footprint
+    category = rng.choice(len(context['categories']), size=n, p=context['category_p'])
+    platform = np.array(SEARCH_PLATFORMS, dtype=object)[rng.choice(len(SEARCH_PLATFORMS), size=n, p=context['platform_p'])]
+
+    # Geographic initialization. 10% are extreme out-of-town searches, the rest start near a random business
+    out_of_town = rng.random(n) < 0.10
+    anchor = rng.integers(0, len(index.latitude), size=n)
+    c_lat = np.where(out_of_town, context['avg_lat'] + rng.normal(0, 0.5, size=n), index.latitude[anchor] + rng.normal(0, 0.04, size=n))
+    c_lon = np.where(out_of_town, context['avg_lon'] + rng.normal(0, 0.5, size=n), index.longitude[anchor] + rng.normal(0, 0.04, size=n))
+
+    # Calculate intrinsic financial scope (Log Normal Demand curve)
+    planned_spend = np.maximum(2.50, np.round(rng.lognormal(context['spend_mu'][category], context['spend_sigma'][category]), 2))
+
+    # --- THE PHYSICAL SIMULATION: best and second-best candidate per journey ---
+    best, second, best_distance = _top_two(index, rng, context['categories'], category, c_lat, c_lon, j_ns, context['cache'])
+    found = best >= 0
+
+    # Ghost collision: the top hit had closed before the journey (closing a week after is fine)
+    is_ghost = found & (index.closure_ns[best] < j_ns)
+    rage_quit = is_ghost & (rng.random(n) < context['rage_quit_probability'])
+    bounce = is_ghost & ~rage_quit & (second >= 0)
+    # Double-fail: bouncing to ANOTHER closed store always yields a rage quit
+    bounce_ghost = bounce & (index.closure_ns[second] < j_ns)
+    bounced = bounce & ~bounce_ghost
+    search_fatigue = rage_quit | bounce_ghost
+
+    final_id = np.where(~is_ghost & found, index.business_id[best], None)
+    final_id[bounced] = index.business_id[second[bounced]]
+    # Rage penalty on wallet after a bounce
+    bounce_spend = np.maximum(1.00, planned_spend * rng.uniform(0.6, 0.95, size=n))
+    actual_spend = np.where(~is_ghost, planned_spend, np.where(bounced, bounce_spend, 0.0))
+    leaked_funds = np.where(search_fatigue, planned_spend, 0.0)
+
+    # Insert noise directly on device coordinates occasionally simulating GPS / Telemetry lag
+    record_lat = np.where(rng.random(n) < 0.98, np.round(c_lat, 6), np.nan)
+    record_lon = np.where(rng.random(n) < 0.98, np.round(c_lon, 6), np.nan)
+    platform[rng.random(n) >= 0.99] = np.nan
+
+    cookie = np.empty((n, 14), dtype=np.uint8)
+    cookie[:, :2] = np.frombuffer(b'U_', dtype=np.uint8)
+    cookie[:, 2:] = _HEX_DIGITS[rng.integers(0, 16, size=(n, 12))]
+
+    # Journeys with nothing in reach never happened, but keep their slot in the numbering
+    timestamps = np.datetime_as_string(j_ns[found].astype('datetime64[ns]').astype('datetime64[s]'))
+    return pd.DataFrame({
+        'journey_id': [f'JNY-{100000 + i:07d}' for i in (start + np.flatnonzero(found)).tolist()],
+        'user_cookie': cookie[found].view('S14').ravel().astype(str).astype(object),
+        'platform': platform[found],
+        'journey_timestamp': timestamps.astype(object),
+        'client_lat_origin': record_lat[found],
+        'client_lon_origin': record_lon[found],
+        'search_category': context['categories'][category[found]],
+        'distance_driven_km': np.round(best_distance[found], 2),
+        'intended_biz_target': index.business_id[best[found]],
+        'ghost_collision_event': is_ghost[found].astype(np.int64),
+        'rage_quit_dropoff': search_fatigue[found].astype(np.int64),
+        'final_visited_biz': final_id[found],
+        'economic_transaction_value': np.round(actual_spend[found], 2),
+        'ecosystem_value_leaked': np.round(leaked_funds[found], 2)
+    })
+
+
+def _top_two(index, rng, categories, category, c_lat, c_lon, j_ns, cache=None):
+    """
+    Best and second-best candidate rows per journey (-1 when there is none), plus the
+    distance to the best one.
+
+    Journeys are grouped by search category and origin cell. Each group is scored
+    against the candidates of its cell as one matrix: candidates out of range or not
+    yet open are set to -inf, and argpartition pulls the top two of every row.
+
+    A cache entry covers its whole time bucket, so it can hold businesses opening
+    after the group's latest journey. They are never visible and draw no noise,
+    which keeps the output identical to the uncached path.
+    """
+    n = len(category)
+    best = np.full(n, -1, dtype=np.int64)
+    second = np.full(n, -1, dtype=np.int64)
+    best_distance = np.full(n, np.nan)
+
+    located = np.flatnonzero(~np.isnan(c_lat) & ~np.isnan(c_lon))
+    cells = index.cell_keys(c_lat[located], c_lon[located])
+    order = np.lexsort((cells, category[located]))
+    located, cells = located[order], cells[order]
+    new_group = (np.diff(category[located]) != 0) | (np.diff(cells) != 0)
+
+    for members, cell in zip(np.split(located, np.flatnonzero(new_group) + 1), cells[np.r_[True, new_group]]):
+        search_cat, latest = categories[category[members[0]]], j_ns[members].max()
+        if cache is not None:
+            entry = cache.candidates(search_cat, cell, latest)
+            rows, b_lat, b_lon = entry['rows'], entry['latitude'], entry['longitude']
+            b_open, b_score = entry['opening_ns'], entry['rating']**3
+        else:
+            rows, _ = index.cell_candidates(search_cat, cell, latest)
+            b_lat, b_lon = index.latitude[rows], index.longitude[rows]
+            b_open, b_score = index.opening_ns[rows], index.rating[rows]**3
+        if len(rows) == 0:
+            continue
+
+        step = max(1, MAX_BLOCK_PAIRS // len(rows))
+        for sub in (members[i:i + step] for i in range(0, len(members), step)):
+            distance = haversine_km(c_lat[sub, None], c_lon[sub, None], b_lat, b_lon)
+            visible = (distance < index.radius_km) & (b_open <= j_ns[sub, None])
+
+            # Attractiveness = Rating^3 / (Distance_km + Epsilon), with Gaussian SEO noise on every visible candidate
+            attractiveness = np.full(distance.shape, -np.inf)
+            attractiveness[visible] = (b_score / (distance + 0.5))[visible] * rng.normal(1.0, 0.4, size=visible.sum())
+
+            if len(rows) > 1:
+                top = np.argpartition(-attractiveness, 1, axis=1)[:, :2]
+            else:
+                top = np.zeros((len(sub), 2), dtype=np.int64)
+            num_visible = visible.sum(axis=1)
+            has_best = num_visible >= 1
+            has_second = num_visible >= 2
+            best[sub[has_best]] = rows[top[has_best, 0]]
+            second[sub[has_second]] = rows[top[has_second, 1]]
+            best_distance[sub[has_best]] = distance[has_best, top[has_best, 0]]
+
+    return best, second, best_distance
+
+
+def _to_ns(when):
+    """Datetime-like or int64 nanoseconds, as int64 nanoseconds."""
+    if isinstance(when, (int, np.integer)):
+        return np.int64(when)
+    return np.datetime64(when, 'ns').astype(np.int64)
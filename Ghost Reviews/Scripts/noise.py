@@ -0,0 +1,169 @@
+"""
+Declarative noise injection shared by the Ghost Reviews generators.
+
+Each script used to hand-roll its chaos pass: `2. Reviews.py` duplicated spam
+rows with a full-frame concat, nulled values through index sets and mangled
+dates with a per-row `.apply`, `3. Customer Journey.py` skewed timestamps with
+another `.apply` and nulled telemetry row by row, and `1. Businesses.py` applied
+case/typo noise inline. Here the noise is a list of rules, applied in order in a
+single pass: every rule draws one vectorized mask and rewrites only the cells it
+hits, one column at a time. Duplicate is the only rule that grows the frame, so
+it should come first. Growing a frame costs one copy of it.
+
+    rules = [
+        Duplicate(0.03, overrides={'review_text': SPAM_TEXT, 'rating': 5.0}),
+        Nullify('rating', 0.01),
+        DateFormats('review_date', {'%Y/%m/%d': 0.02, '%m-%d-%y': 0.02}),
+    ]
+    df = apply_noise(df, rules, rng)
+"""
+import numpy as np
+import pandas as pd
+
+# Formats NumPy renders natively (and far faster than strftime), by datetime64 unit
+_ISO_UNITS = {'%Y-%m-%d': 'D', '%Y-%m-%dT%H:%M:%S': 's'}
+
+
+def apply_noise(df, rules, rng):
+    """Applies `rules` in order with the Generator `rng` and returns the noisy frame."""
+    for rule in rules:
+        df = rule.apply(df, rng)
+    return df
+
+
+class Nullify:
+    """Blanks `rate` of the values in `column` (NaN, or NaT for datetimes)."""
+
+    def __init__(self, column, rate):
+        self.column = column
+        self.rate = rate
+
+    def apply(self, df, rng):
+        mask = rng.random(len(df)) < self.rate
+        if mask.any():
+            df[self.column] = df[self.column].mask(mask)
+        return df
+
+
+class Duplicate:
+    """
+    Appends copies of `rate` of the rows, sampled without replacement, with
+    `overrides` applied to the copies. An override is a scalar or a callable that
+    takes the number of copies and returns their values (e.g. fresh IDs).
+
+    The grown frame is a new one: each column is copied once, with its extra rows
+    appended, and the input frame is left as it was. Categorical columns keep
+    their dtype, with any new override values added as categories.
+    """
+
+    def __init__(self, rate, overrides=None):
+        self.rate = rate
+        self.overrides = overrides or {}
+
+    def apply(self, df, rng):
+        count = int(len(df) * self.rate)
+        if count == 0:
+            return df
+        picked = rng.choice(len(df), size=count, replace=False)
+        values = {col: value(count) if callable(value) else value for col, value in self.overrides.items()}
+
+        grown = {}
+        for col in df.columns:
+            column = df[col]
+            if isinstance(column.dtype, pd.CategoricalDtype):
+                categories = column.cat.categories
+                if col in values:
+                    missing = pd.Index(pd.unique(np.atleast_1d(values[col]))).difference(categories)
+                    categories = categories.append(missing)
+                    extra = categories.get_indexer(np.broadcast_to(values[col], count))
+                else:
+                    extra = column.cat.codes.to_numpy()[picked]
+                dtype = pd.CategoricalDtype(categories, ordered=column.cat.ordered)
+                grown[col] = pd.Categorical.from_codes(np.concatenate([column.cat.codes.to_numpy(), extra]), dtype=dtype)
+            elif col in values:
+                extra = pd.Series(np.broadcast_to(values[col], count), dtype=column.dtype)
+                grown[col] = pd.concat([column, extra], ignore_index=True)
+            else:
+                grown[col] = pd.concat([column, column.iloc[picked]], ignore_index=True)
+        return pd.DataFrame(grown)
+
+
+class DateFormats:
+    """
+    Renders a date column as text: `variants` maps alternative strftime formats
+    to the share of values written in them, the rest use `default`. Missing dates
+    stay missing. A column that is already text is taken to be in `default`, so
+    only the rows picked for a variant are parsed and rewritten.
+    """
+
+    def __init__(self, column, variants, default='%Y-%m-%d'):
+        self.column = column
+        self.variants = variants
+        self.default = default
+
+    def apply(self, df, rng):
+        values = df[self.column]
+        # One draw per row picks its format: [0, 1) is cut into the variant shares, the rest is the default
+        cut = np.cumsum(list(self.variants.values()))
+        choice = (np.searchsorted(cut, rng.random(len(df)), side='right') + 1) % (len(cut) + 1)
+
+        present = values.notna().to_numpy()
+        if pd.api.types.infer_dtype(values, skipna=True) == 'string':
+            text = values.to_numpy(dtype=object, copy=True)
+            formats = {code: fmt for code, fmt in enumerate(self.variants, start=1)}
+        else:
+            text = np.full(len(df), np.nan, dtype=object)
+            formats = dict(enumerate([self.default] + list(self.variants)))
+        for code, fmt in formats.items():
+            rows = np.flatnonzero((choice == code) & present)
+            if len(rows):
+                text[rows] = _format_dates(pd.to_datetime(values.iloc[rows], format='ISO8601'), fmt)
+        df[self.column] = text
+        return df
+
+
+class Typos:
+    """
+    Case and typo noise on a text column: `lower` of the values are lowercased,
+    otherwise `upper` of them uppercased, and independently `drop_last` of the
+    values longer than `min_length` lose their last character.
+    """
+
+    def __init__(self, column, lower=0.0, upper=0.0, drop_last=0.0, min_length=3):
+        self.column = column
+        self.lower = lower
+        self.upper = upper
+        self.drop_last = drop_last
+        self.min_length = min_length
+
+    def apply(self, df, rng):
+        n = len(df)
+        lower = rng.random(n) < self.lower
+        upper = ~lower & (rng.random(n) < self.upper)
+        dropped = rng.random(n) < self.drop_last
+        rows = np.flatnonzero(lower | upper | dropped)
+        if not len(rows):
+            return df
+
+        # Only the hit values go through the (per-string) str methods
+        text = df[self.column].iloc[rows].astype(object)
+        text = text.where(~lower[rows], text.str.lower())
+        text = text.where(~upper[rows], text.str.upper())
+        text = text.where(~(dropped[rows] & (text.str.len() > self.min_length)), text.str[:-1])
+
+        if isinstance(df[self.column].dtype, pd.CategoricalDtype):
+            missing = pd.Index(text.dropna().unique()).difference(df[self.column].cat.categories)
+            if len(missing):
+                df[self.column] = df[self.column].cat.add_categories(missing)
+        df.iloc[rows, df.columns.get_loc(self.column)] = text.to_numpy()
+        return df
+
+
+def _format_dates(dates, fmt):
+    """Formats each distinct value once; generated dates repeat a lot, so this is far cheaper per row."""
+    codes, uniques = pd.factorize(dates)
+    if fmt in _ISO_UNITS:
+        text = np.datetime_as_string(uniques.to_numpy(dtype='datetime64[ns]'), unit=_ISO_UNITS[fmt]).astype(object)
+    else:
+        text = uniques.strftime(fmt).to_numpy(dtype=object)
+    return text[codes]
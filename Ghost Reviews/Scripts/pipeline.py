@@ -0,0 +1,134 @@
+"""
+In-process Ghost Reviews pipeline: businesses -> reviews -> journeys in one call.
+
+The three numbered scripts only talk through files on disk, so every stage pays
+for serializing the business table and parsing it back. run_pipeline keeps the
+frames in memory and hands the business table straight to the review and journey
+engines, whose NumPy column views are taken without copying. Writing each stage
+to disk is optional, which makes the generator easy to embed in a test harness.
+
+Reviews and journeys get the scripts' output noise passes (review spam copies,
+lost ratings and dates and legacy date formats; journey timestamp skew), each from
+its own seed stream. Every frame is then converted to its compact schema
+(schema.py). Like the vectorized engines it uses, the output matches the scripts'
+distributions, not their rows.
+
+With a `cache_dir`, stage outputs go through a StageCache (stage_cache.py): a
+rerun reuses every stage whose config, seed, code and upstream inputs are
+unchanged and only rebuilds the stages downstream of what changed.
+"""
+import sys
+from datetime import date, datetime, time
+from pathlib import Path
+
+import numpy as np
+
+from business_engine import generate_businesses
+from journey_engine import TIMESTAMP_NOISE, CandidateIndex, simulate_journeys
+from noise import apply_noise
+from review_engine import SPAM_BOT_PROBABILITY, UserPopulation, generate_reviews_sharded, review_noise_rules
+from schema import apply_schema
+from stage_cache import StageCache, code_version
+from table_io import heal_businesses, write_table
+
+# Shared helpers live in Shared/ at the repository root
+sys.path.append(str(Path(__file__).resolve().parents[2] / 'Shared'))
+from faker_pool import faker_version
+from instrument import span
+
+STAGES = ('businesses', 'reviews', 'journeys')
+OUTPUT_NAMES = {'businesses': 'simulated_businesses', 'reviews': 'simulated_reviews', 'journeys': 'simulated_customer_journeys'}
+
+# Source files whose code determines each stage's output (part of its cache key). Business
+# names come from a Faker pool, so the businesses key also covers faker_pool.py and the
+# installed Faker version (in its config)
+STAGE_SOURCES = {
+    'businesses': ['pipeline.py', 'schema.py', 'business_engine.py', '../../Shared/faker_pool.py'],
+    'reviews': ['pipeline.py', 'schema.py', 'table_io.py', 'noise.py', 'review_engine.py', 'review_text.py', 'sampling.py'],
+    'journeys': ['pipeline.py', 'schema.py', 'table_io.py', 'noise.py', 'journey_engine.py'],
+}
+
+
+def run_pipeline(num_businesses=2500, num_journeys=25000, seed=42, today=None, workers=1,
+                 output_dir=None, fmt='csv', write=STAGES, review_knobs=None, journey_knobs=None,
+                 cache_dir=None, cache_max_bytes=None, cache_max_age_days=None):
+    """
+    Runs every stage and returns {'businesses', 'reviews', 'journeys'} DataFrames.
+
+    `seed` drives all stages (each gets its own stream). When `output_dir` is
+    given, the stages named in `write` are also saved there under the scripts'
+    file names (OUTPUT_NAMES) in format `fmt`. `review_knobs` and
+    `journey_knobs` are passed on to generate_reviews_sharded and
+    simulate_journeys, e.g. review_knobs={'ghost_review_probability': 0.2};
+    review_knobs may also set 'spam_bot_probability' for the noise pass, as in
+    sweep.py.
+
+    `cache_dir` enables the stage cache, bounded by `cache_max_bytes` and
+    `cache_max_age_days`. Since the clock is part of every key, a cached run
+    without `today` uses midnight of the current day, so reruns on the same day
+    can hit.
+
+    Each stage, the self-heal pass, the user population, the noise passes and
+    each write run in a named span (Shared/instrument.py), which the GENERATOR_*
+    environment variables can trace or profile.
+    """
+    cache = StageCache(cache_dir, cache_max_bytes, cache_max_age_days) if cache_dir is not None else None
+    if today is None:
+        today = datetime.combine(date.today(), time()) if cache else datetime.now() # One clock for every stage
+    # The noise seeds come after the stage seeds, so adding them left the stage streams unchanged
+    business_seed, user_seed, review_seed, journey_seed, review_noise_seed, journey_noise_seed = \
+        np.random.SeedSequence(seed).generate_state(6)
+    frames, keys = {}, {}
+
+    def run_stage(stage, config, upstream, build):
+        with span(stage) as timing:
+            if cache is None:
+                frames[stage] = build()
+            else:
+                config = dict(config, today=today)
+                keys[stage] = cache.key(stage, config, seed, code_version(STAGE_SOURCES[stage]), [keys[u] for u in upstream])
+                df = cache.load(stage, keys[stage])
+                if df is None:
+                    df = build()
+                    cache.store(stage, keys[stage], df, {'config': config, 'seed': seed, 'upstream': {u: keys[u] for u in upstream}})
+                frames[stage] = df
+            timing.rows = len(frames[stage])
+
+    run_stage('businesses', {'num_businesses': num_businesses, 'faker': faker_version()}, [],
+              lambda: apply_schema(generate_businesses(num_businesses, seed=int(business_seed), today=today), 'businesses'))
+
+    # Downstream stages see the same self-healed table the scripts build after loading it
+    df_biz = frames['businesses']
+    with span('self-heal', rows=len(df_biz)):
+        healed = heal_businesses(df_biz.copy(deep=False), today, rng=np.random.RandomState(int(user_seed)))
+
+    def build_reviews():
+        knobs = dict(review_knobs or {})
+        spam_bot_probability = knobs.pop('spam_bot_probability', SPAM_BOT_PROBABILITY)
+        with span('user population', rows=int(len(healed) * 3)):
+            population = UserPopulation.build(int(len(healed) * 3), np.random.default_rng(user_seed))
+        df_reviews = generate_reviews_sharded(healed, population, seed=int(review_seed), workers=workers, today=today, **knobs)
+        with span('noise injection') as noising:
+            rules = review_noise_rules(10000 + len(df_reviews), spam_bot_probability)
+            df_reviews = apply_noise(df_reviews, rules, np.random.default_rng(review_noise_seed))
+            noising.rows = len(df_reviews)
+        return apply_schema(df_reviews, 'reviews')
+
+    def build_journeys():
+        df_journeys = simulate_journeys(CandidateIndex(healed), num_journeys, np.random.default_rng(journey_seed),
+                                        today=today, **(journey_knobs or {}))
+        with span('noise injection', rows=len(df_journeys)):
+            df_journeys = apply_noise(df_journeys, TIMESTAMP_NOISE, np.random.default_rng(journey_noise_seed))
+        return apply_schema(df_journeys, 'journeys')
+
+    # workers is left out of the key: sharded output is identical for any worker count
+    run_stage('reviews', {'review_knobs': review_knobs or {}}, ['businesses'], build_reviews)
+    run_stage('journeys', {'num_journeys': num_journeys, 'journey_knobs': journey_knobs or {}}, ['businesses'], build_journeys)
+
+    if output_dir is not None:
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        for stage in write:
+            with span('write', rows=len(frames[stage])):
+                write_table(frames[stage], output_dir / OUTPUT_NAMES[stage], fmt)
+    return frames
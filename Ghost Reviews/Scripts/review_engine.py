@@ -0,0 +1,349 @@
+"""
+Batched review engine for the review simulation.
+
+`2. Reviews.py` walks `df_biz.iterrows()` and then loops over every review of every
+business, paying for several scalar NumPy draws, `pd.notnull` checks, `timedelta`
+arithmetic and a dict per review. Here the per-business review counts are expanded
+into flat arrays (one slot per review, tagged with its business row) and every
+step (burst clumping, beta-skewed ghost dates after closure, anchor + user bias
+ratings with the pre-closure decay, text, upvotes, edit flags) is computed for all
+reviews at once. Dates stay int64 nanoseconds until the frame is assembled, and the
+text comes back dictionary-encoded (see review_text.py).
+
+The output has the same columns and distributions as the loop in `2. Reviews.py`
+(before its chaos/noise pass), not the same rows.
+"""
+import multiprocessing
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pandas.api.types import union_categoricals
+
+from date_parser import parse_mixed_dates
+from noise import DateFormats, Duplicate, Nullify, apply_noise
+from review_text import SPAM_TEXT, generate_text
+from sampling import AliasSampler
+
+# Behavior variables
+GHOST_REVIEW_PROBABILITY = 0.08      # Chance of reviewing a dead business post-closure
+BURST_PROBABILITY = 0.05             # Chance a business experiences a "Review Bomb / Viral Spike"
+SPAM_BOT_PROBABILITY = 0.03          # Chance a review is duplicated bot spam
+CONTRADICTION_PROBABILITY = 0.02     # E.g., user clicked 1-star but text says "I loved it!"
+
+DAY_NS = 86_400 * 10**9
+
+# Businesses per shard in generate_reviews_sharded. Fixed, never derived from the
+# worker count, because shard boundaries decide which seed stream a business uses.
+DEFAULT_SHARD_SIZE = 20_000
+
+
+class UserPopulation:
+    """
+    Array-backed power-law user population.
+
+    Replaces the list of (user_id, bias, weight) tuples and the USER_BIASES dict:
+    IDs are kept as their int32 number, biases as float32, and the frequency weights
+    only live on as an alias table. That is ~20 bytes per user, so a 30M-user
+    population needs well under 1 GB.
+    """
+
+    def __init__(self, id_numbers, sentiment_biases, frequency_weights):
+        self.id_numbers = np.asarray(id_numbers, dtype=np.int32)
+        self.sentiment_biases = np.asarray(sentiment_biases, dtype=np.float32)
+        self.sampler = AliasSampler(frequency_weights)
+
+    @classmethod
+    def build(cls, num_users, rng):
+        id_numbers = rng.integers(1000000, 10000000, size=num_users)
+        # Behavioral biases: Some users are generous (bias +1), some are extremely critical (bias -1.5)
+        sentiment_biases = rng.normal(0, 0.7, size=num_users)
+        # Frequency tier: Power law for reviews.
+        frequency_weights = (rng.pareto(1.5, size=num_users) + 1).astype(np.int64)
+
+        # Users that drew the same ID are the same person: like the USER_BIASES dict,
+        # the last one drawn decides the bias they all share
+        order = np.argsort(id_numbers, kind='stable')
+        new_group = np.r_[True, id_numbers[order][1:] != id_numbers[order][:-1]]
+        group = np.cumsum(new_group) - 1
+        group_last = order[np.r_[np.flatnonzero(new_group)[1:] - 1, num_users - 1]]
+        shared_biases = np.empty(num_users)
+        shared_biases[order] = sentiment_biases[group_last[group]]
+        return cls(id_numbers, shared_biases, frequency_weights)
+
+    def __len__(self):
+        return len(self.id_numbers)
+
+    def sample(self, size, rng):
+        """Draws `size` user indices, weighted by review frequency."""
+        return self.sampler.sample(size, rng)
+
+    def user_ids(self, users):
+        """Formats user indices as 'USR-xxxxxxx' strings."""
+        return np.array([f"USR-{i}" for i in self.id_numbers[users]], dtype=object)
+
+
+def generate_reviews(df_biz, population, rng, today=None, review_id_start=10000, **knobs):
+    """
+    Generates every review for the (self-healed) business table in one batch.
+
+    Authors are drawn from `population` (a UserPopulation). Review dates come back
+    as midnight datetime64 values. `knobs` override the behavior variables, e.g.
+    ghost_review_probability=0.2.
+    """
+    df_reviews = _review_rows(df_biz, population, rng, today or datetime.now(), **knobs)
+    df_reviews.insert(0, 'review_id', review_ids(review_id_start, len(df_reviews)))
+    return df_reviews
+
+
+def generate_reviews_sharded(df_biz, population, seed, workers=1, shard_size=DEFAULT_SHARD_SIZE,
+                             today=None, review_id_start=10000, **knobs):
+    """
+    Splits the business table into fixed shards of `shard_size` rows and generates
+    their reviews on a pool of `workers` processes.
+
+    Every shard gets its own seed stream spawned from the master `seed`, and review
+    IDs are assigned by the parent after merging the shards in order. Shard
+    boundaries never depend on `workers`, so the output is byte-identical whatever
+    the worker count.
+    """
+    today = today or datetime.now() # Resolved once so every worker sees the same clock
+    starts = range(0, len(df_biz), shard_size)
+    shard_seeds = np.random.SeedSequence(seed).spawn(len(starts))
+    tasks = [(df_biz.iloc[start:start + shard_size], shard_seed, today, knobs) for start, shard_seed in zip(starts, shard_seeds)]
+
+    if workers > 1 and len(tasks) > 1:
+        # Forked workers inherit the population instead of unpickling it, and don't
+        # re-run the calling script the way spawned ones do
+        context = multiprocessing.get_context('fork' if 'fork' in multiprocessing.get_all_start_methods() else None)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_shard_worker, initargs=(population,)) as pool:
+            shards = list(pool.map(_review_shard, tasks))
+    else:
+        _init_shard_worker(population)
+        shards = [_review_shard(task) for task in tasks]
+
+    if not shards:
+        return generate_reviews(df_biz, population, np.random.default_rng(seed), today, review_id_start, **knobs)
+    # Shards extend the text dictionary with their own typo strings, so the text
+    # columns are unioned separately instead of letting concat fall back to objects
+    texts = union_categoricals([shard.pop('review_text') for shard in shards])
+    df_reviews = pd.concat(shards, ignore_index=True)
+    df_reviews.insert(df_reviews.columns.get_loc('rating') + 1, 'review_text', texts)
+    df_reviews.insert(0, 'review_id', review_ids(review_id_start, len(df_reviews)))
+    return df_reviews
+
+
+def iter_presorted_reviews(df_biz, population, seed, today=None, shard_size=DEFAULT_SHARD_SIZE, review_id_start=10000,
+                           spam_bot_probability=SPAM_BOT_PROBABILITY, stagger_days=5, **knobs):
+    """
+    Yields the finished review table (chaos pass included) shard by shard, already
+    in the order `2. Reviews.py` sorts it into: by business_id, then by review date
+    plus up to `stagger_days` days of ingestion stagger, missing dates last.
+
+    Businesses are visited in business_id order and a shard never splits an ID, so
+    each shard only orders its own rows, spam copies included, and the shards
+    concatenate into a sorted table. Only one shard is in memory at a time, which
+    lets callers append each one to the output as it arrives. Review IDs count up
+    shard by shard, each shard's spam copies right after its reviews.
+    """
+    today = today or datetime.now()
+    ids = df_biz['business_id'].to_numpy(dtype=object)
+    order = np.argsort(ids, kind='stable')
+    ids = ids[order]
+
+    bounds = [0]
+    while bounds[-1] < len(ids):
+        end = min(bounds[-1] + shard_size, len(ids))
+        while end < len(ids) and ids[end] == ids[end - 1]:
+            end += 1 # Duplicate IDs stay in one shard
+        bounds.append(end)
+
+    next_id = review_id_start
+    for start, end, shard_seed in zip(bounds[:-1], bounds[1:], np.random.SeedSequence(seed).spawn(len(bounds) - 1)):
+        review_rng, noise_rng = (np.random.default_rng(s) for s in shard_seed.spawn(2))
+        shard = _review_rows(df_biz.iloc[order[start:end]], population, review_rng, today, **knobs)
+        shard.insert(0, 'review_id', review_ids(next_id, len(shard)))
+        shard = apply_noise(shard, review_noise_rules(next_id + len(shard), spam_bot_probability), noise_rng)
+        next_id += len(shard)
+
+        # Sort loosely by date (mostly chronological, but messy data ingests over time)
+        dates, _ = parse_mixed_dates(shard['review_date'])
+        stagger = noise_rng.integers(-stagger_days, stagger_days + 1, size=len(shard)) * DAY_NS
+        sort_key = np.where(dates.isna(), np.iinfo(np.int64).max, dates.to_numpy(dtype='datetime64[ns]').view(np.int64) + stagger)
+        business_rank = pd.factorize(shard['business_id'], sort=True)[0]
+        yield shard.iloc[np.lexsort((sort_key, business_rank))].reset_index(drop=True)
+
+
+def review_ids(start, count):
+    """Formats `count` consecutive 'REV-n' IDs beginning at `start`."""
+    return np.array([f"REV-{i}" for i in range(start, start + count)], dtype=object)
+
+
+def review_noise_rules(review_id_start, spam_bot_probability=SPAM_BOT_PROBABILITY):
+    """
+    The chaos pass of `2. Reviews.py` as noise rules (see noise.py). Spam copies
+    get IDs counting up from `review_id_start`.
+    """
+    return [
+        # Guardrail 45: Occasional duplicated bot spam; spammers heavily blast the same text
+        Duplicate(spam_bot_probability, overrides={
+            'review_id': lambda count: review_ids(review_id_start, count),
+            'review_text': SPAM_TEXT,
+            'rating': 5.0,
+        }),
+        # Guardrail 43: System Missing/Nulling values intentionally
+        Nullify('rating', 0.01), # Accidental lost rating
+        Nullify('review_date', 0.015), # Log ingestion error
+        # Guardrail 44: Formatting shifts in output (simulate legacy migration formats and sloppy normalization)
+        DateFormats('review_date', {'%Y/%m/%d': 0.02, '%m-%d-%y': 0.02}),
+    ]
+
+
+class ReviewAudit:
+    """
+    Running totals behind the audit `2. Reviews.py` prints. A table streamed
+    shard by shard (iter_presorted_reviews) is audited as it goes, without
+    holding it. After every piece of the final table has been added, the numbers
+    equal an audit of the whole table.
+
+    Helpful votes are kept as a count per vote value, which gives the exact
+    median. Reviews per user are kept as a count per user ID.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.nulls = {}
+        self.date_formats = None
+        self.null_ratings = 0
+        self.five_star_complaints = 0
+        self.spam_reviews = 0
+        self.votes = None
+        self.reviews_per_user = None
+
+    def add(self, df_reviews, date_formats=None):
+        """
+        Adds one piece of the review table. `date_formats` are its counts from
+        parse_mixed_dates, if the caller already parsed the dates.
+        """
+        if date_formats is None:
+            _, date_formats = parse_mixed_dates(df_reviews['review_date'])
+        self.rows += len(df_reviews)
+        for column, nulls in df_reviews.isnull().sum().items():
+            self.nulls[column] = self.nulls.get(column, 0) + int(nulls)
+        self.date_formats = date_formats if self.date_formats is None else self.date_formats + date_formats
+        self.null_ratings += int(df_reviews['rating'].isnull().sum())
+
+        text = df_reviews['review_text']
+        self.five_star_complaints += int(((df_reviews['rating'] == 5) & text.str.contains('Terrible|Awful|DO NOT', na=False, case=False)).sum())
+        self.spam_reviews += int(text.str.contains('Buy followers', na=False, case=False).sum())
+        self.votes = _tally(self.votes, df_reviews['helpful_votes'])
+        self.reviews_per_user = _tally(self.reviews_per_user, df_reviews['user_id'])
+
+    @property
+    def max_helpful_votes(self):
+        return self.votes.index.max()
+
+    @property
+    def median_helpful_votes(self):
+        votes = self.votes.sort_index()
+        total = int(votes.sum())
+        if total == 0:
+            return np.nan
+        # The middle value (or the two middle values) of the sorted votes
+        positions = np.searchsorted(votes.cumsum().to_numpy(), [(total - 1) // 2, total // 2], side='right')
+        return float(votes.index.to_numpy()[positions].mean())
+
+
+def _tally(total, values):
+    """Adds the value counts of `values` (missing values left out) to the running counts `total`."""
+    counts = values.value_counts(sort=False)
+    counts = counts[counts > 0] # Categoricals also list their unused categories
+    if isinstance(counts.index, pd.CategoricalIndex):
+        counts.index = counts.index.astype(counts.index.categories.dtype)
+    return counts if total is None else total.add(counts, fill_value=0).astype(np.int64)
+
+
+# Each worker process receives the (large) user population once, not once per shard
+_SHARD_POPULATION = None
+
+
+def _init_shard_worker(population):
+    global _SHARD_POPULATION
+    _SHARD_POPULATION = population
+
+
+def _review_shard(task):
+    df_shard, shard_seed, today, knobs = task
+    return _review_rows(df_shard, _SHARD_POPULATION, np.random.default_rng(shard_seed), today, **knobs)
+
+
+def _review_rows(df_biz, population, rng, today,
+                 ghost_review_probability=GHOST_REVIEW_PROBABILITY,
+                 burst_probability=BURST_PROBABILITY,
+                 contradiction_probability=CONTRADICTION_PROBABILITY):
+    """Every column of the review table except review_id."""
+
+    opening = df_biz['opening_date'].to_numpy(dtype='datetime64[ns]').view(np.int64)
+    closure_dt = df_biz['closure_date'].to_numpy(dtype='datetime64[ns]')
+    has_close = ~np.isnat(closure_dt)
+    closure = closure_dt.view(np.int64)
+    today_ns = np.datetime64(today, 'ns').astype(np.int64)
+    num_biz = len(df_biz)
+
+    # --- Per business: sync drift and review bursts ---
+    # Introduce Relational Dissonance (Sync lags). Actual counts might drift slightly from parent dataset
+    expected = df_biz['review_count'].to_numpy(dtype=np.int64)
+    drift = (expected * rng.uniform(-0.1, 0.1, size=num_biz)).astype(np.int64)
+    target = np.maximum(0, expected + drift)
+
+    end_boundary = np.where(has_close, closure, today_ns)
+    has_burst = (target > 20) & (rng.random(num_biz) < burst_probability)
+    burst_days = np.maximum(1, (end_boundary - opening) // DAY_NS)
+    burst_center = opening + rng.integers(1, burst_days + 1) * DAY_NS
+
+    # --- Expand to one slot per review ---
+    biz = np.repeat(np.arange(num_biz), target)
+    n = len(biz)
+    b_open, b_close, b_has_close, b_end = opening[biz], closure[biz], has_close[biz], end_boundary[biz]
+
+    # Pull user batch efficiently based on heavy-tail weights
+    author = population.sample(n, rng)
+
+    # --- 1. DETERMINE DATE ---
+    # Ghosts usually happen closely after closure; beta distribution skewed towards the early days
+    is_ghost = b_has_close & (rng.random(n) < ghost_review_probability)
+    days_since_close = (today_ns - b_close) // DAY_NS
+    days_since_close = np.where(days_since_close <= 1, 2, days_since_close)
+    ghost_date = b_close + (rng.beta(1.5, 5, size=n) * days_since_close).astype(np.int64) * DAY_NS
+
+    # Normal life reviews, 40% of which clump around the burst center when there is one
+    in_burst = has_burst[biz] & (rng.random(n) < 0.4)
+    burst_date = burst_center[biz] + rng.normal(0, 3, size=n).astype(np.int64) * DAY_NS
+    total_days = np.maximum(1, (b_end - b_open) // DAY_NS)
+    life_date = b_open + rng.integers(0, total_days + 1) * DAY_NS
+
+    r_date = np.where(is_ghost, ghost_date, np.where(in_burst, burst_date, life_date))
+    r_date = np.minimum(np.maximum(r_date, b_open), today_ns) # Bound logic guard
+
+    # --- 2. DETERMINE RATING (Lifecycle / Decay Aware) ---
+    base_r = df_biz['average_rating'].to_numpy(dtype=float)[biz] + population.sentiment_biases[author] + rng.normal(0, 0.5, size=n)
+    # Sentiment Decay: the last few months before a closure feature severe drop-offs in quality
+    base_r -= np.where(b_has_close & ((b_close - r_date) // DAY_NS < 90), 1.5, 0.0)
+    life_rating = np.clip(np.round(base_r), 1, 5).astype(np.int64)
+    ghost_rating = np.where(rng.random(n) < 0.8, 1, 2) # Usually angry/confused about closed place
+    rating = np.where(is_ghost, ghost_rating, life_rating)
+
+    # --- 3. METADATA IMPERFECTIONS ---
+    text = generate_text(rating, is_ghost, rng, contradiction_probability)
+    # Polarizing reviews get more 'Helpful' upvotes, following a heavy tail
+    upvotes = (rng.pareto(1.2, size=n) * np.where((rating == 1) | (rating == 5), 1, 0.2)).astype(np.int64)
+
+    return pd.DataFrame({
+        'business_id': df_biz['business_id'].to_numpy()[biz],
+        'user_id': population.user_ids(author),
+        'review_date': (r_date // DAY_NS * DAY_NS).astype('datetime64[ns]'),
+        'rating': rating.astype(float),
+        'review_text': text,
+        'helpful_votes': upvotes,
+        'is_edited': (rng.random(n) < 0.05).astype(np.int64)
+    })
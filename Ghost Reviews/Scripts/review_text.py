@@ -0,0 +1,141 @@
+"""
+Dictionary-encoded review text.
+
+Review text only ever comes from a few hundred fragment combinations, so building a
+fresh Python string per review (plus another per lowercase, uppercase or typo pass)
+wastes most of the time and memory of a large run. Instead:
+
+1. ReviewTextTable enumerates every combination once, in each case variant.
+2. generate_text picks text for a whole batch as integer codes into that table.
+3. The noise passes (contradictions, ghost bodies, case changes, typos, empty text)
+   are applied as vectorized masks on the codes. Only the handful of distinct typo
+   strings that actually occur are ever built.
+
+The result is a pandas Categorical, so tens of millions of reviews share a few
+thousand strings and CSV/Parquet writers see a dictionary column.
+"""
+import numpy as np
+import pandas as pd
+
+# --- Combinatorial High-Cardinality Text Engine ---
+# By combining pieces, we easily get >100,000 unique reviews
+FRAGMENTS = {
+    5: {
+        'intro':["Absolutely fantastic.", "A revelation!", "Loved every second.", "Perfection.", "10/10."],
+        'body':["The ambiance and quality were off the charts.", "Everything exceeded my highest expectations.", "You can tell they really care about their craft.", "My new favorite spot."],
+        'outro':["Will definitely be coming back!", "Can't recommend it enough.", "Bringing my friends next time.", "Just wow."]
+    },
+    4: {
+        'intro':["Pretty good overall.", "A solid choice.", "Really nice.", "I liked it.", "Very pleasant."],
+        'body':["Quality was great, though it took a little while.", "Nearly perfect, just missing a tiny spark.", "A few hiccups but largely a wonderful time.", "Delivered exactly what was promised."],
+        'outro':["I'll return soon.", "Good value.", "Worth a visit if you're in the area.", "Thumbs up."]
+    },
+    3: {
+        'intro':["It was okay.", "Exactly average.", "Nothing special.", "Meh.", "Not bad, not great."],
+        'body':["Met my expectations but didn't wow me.", "You get what you pay for.", "There are better places, but also worse.", "Totally middle of the road."],
+        'outro':["Might go back, might not.", "It is what it is.", "Fairly standard.", "Could be better."]
+    },
+    2: {
+        'intro':["Disappointing.", "Really fell short.", "Yikes.", "Not worth the hype.", "Below average."],
+        'body':["We waited forever and it wasn't worth it.", "Staff seemed overwhelmed and quality suffered.", "The whole thing felt poorly managed.", "I wanted to like it, but I just can't."],
+        'outro':["I'd suggest going elsewhere.", "Not returning.", "Save your money.", "Needs major improvements."]
+    },
+    1: {
+        'intro':["Terrible.", "Worst ever.", "Absolute disaster.", "DO NOT GO HERE.", "Horrific."],
+        'body':["Complete lack of respect for customers.", "Everything was awful, start to finish.", "A chaotic mess, ruined my night.", "They scammed us essentially."],
+        'outro':["Avoid at all costs!!!", "Never stepping foot here again.", "Reporting this place.", "Zero stars if I could."]
+    },
+    'ghost': {
+        'body':["Maps said it was open but it's boarded up?", "Drove an hour and it looks abandoned.", "Are they closed forever? Lights out.", "Says open online. Complete lie. Closed."],
+    }
+}
+
+# Spammers heavily blast the same text (Guardrail 45). Part of the table so spam rows stay encoded.
+SPAM_TEXT = "Great link !! Buy followers online cheap >> link.com"
+
+CASE_VARIANTS = 3 # as written, lower, UPPER
+
+
+class ReviewTextTable:
+    """
+    Every review text the generator can emit without a typo.
+
+    Base texts are the 5 x (intro x body x outro) combinations, then the ghost bodies,
+    then the spam text. Each is stored in all CASE_VARIANTS, so the code of a text
+    is `base * CASE_VARIANTS + case`.
+    """
+
+    def __init__(self, fragments=FRAGMENTS, spam_text=SPAM_TEXT):
+        self.shape = {r: (len(fragments[r]['intro']), len(fragments[r]['body']), len(fragments[r]['outro'])) for r in range(1, 6)}
+        base = [
+            f"{intro} {body} {outro}"
+            for rating in range(1, 6)
+            for intro in fragments[rating]['intro']
+            for body in fragments[rating]['body']
+            for outro in fragments[rating]['outro']
+        ]
+        self.rating_offset = np.cumsum([0] + [int(np.prod(self.shape[r])) for r in range(1, 6)])
+        self.ghost_offset = len(base)
+        self.num_ghost = len(fragments['ghost']['body'])
+        base += fragments['ghost']['body']
+        self.spam_base = len(base)
+        base.append(spam_text)
+        self.strings = [variant for text in base for variant in (text, text.lower(), text.upper())]
+
+    def pick_combinations(self, ratings, rng):
+        """One random intro/body/outro combination per rating, as base indices."""
+        base = np.empty(len(ratings), dtype=np.int64)
+        for rating in range(1, 6):
+            rows = np.flatnonzero(ratings == rating)
+            intros, bodies, outros = self.shape[rating]
+            base[rows] = (
+                self.rating_offset[rating - 1]
+                + rng.integers(0, intros, size=len(rows)) * bodies * outros
+                + rng.integers(0, bodies, size=len(rows)) * outros
+                + rng.integers(0, outros, size=len(rows))
+            )
+        return base
+
+    def categorical(self, codes, extra_strings=()):
+        """Wraps codes (-1 for empty text) into a Categorical over the table plus any extra strings."""
+        categories = self.strings + list(extra_strings)
+        unique_codes, unique = pd.factorize(np.array(categories, dtype=object))
+        codes = np.where(codes < 0, -1, unique_codes[np.maximum(codes, 0)])
+        return pd.Categorical.from_codes(codes, categories=unique)
+
+
+def generate_text(ratings, is_ghost, rng, contradiction_probability, table=None):
+    """Batch version of `generate_text()` in `2. Reviews.py`, returned as a Categorical (NaN = empty text)."""
+    table = table or ReviewTextTable()
+    n = len(ratings)
+
+    # Guardrail 37 & Contradiction check
+    contradicts = rng.random(n) < contradiction_probability
+    effective = np.where(contradicts, np.where(ratings == 5, 1, 5), ratings)
+    base = table.pick_combinations(effective, rng)
+
+    ghost_body = is_ghost & (rng.random(n) < 0.7)
+    base = np.where(ghost_body, table.ghost_offset + rng.integers(0, table.num_ghost, size=n), base)
+
+    # Apply Typographical & Format Noise: lazy typist lowercase, then ALL CAPS RANT wins
+    lower = rng.random(n) < 0.1
+    upper = rng.random(n) < 0.05
+    codes = base * CASE_VARIANTS + np.where(upper, 2, np.where(lower, 1, 0))
+
+    # Insert a realistic typo (duplicate char or drop char). Only the distinct
+    # (text, position, kind) triples that occur are turned into new strings.
+    typo_rows = np.flatnonzero(rng.random(n) < 0.05)
+    lengths = np.array([len(s) for s in table.strings])
+    width = lengths.max()
+    position = (rng.random(len(typo_rows)) * (lengths[codes[typo_rows]] - 1)).astype(np.int64)
+    duplicate = rng.random(len(typo_rows)) < 0.5
+    typo_keys, typo_index = np.unique((codes[typo_rows] * width + position) * 2 + duplicate, return_inverse=True)
+    typo_strings = []
+    for code, idx, dup in zip((typo_keys // 2 // width).tolist(), (typo_keys // 2 % width).tolist(), (typo_keys % 2).tolist()):
+        s = table.strings[code]
+        typo_strings.append(s[:idx] + s[idx] + s[idx:] if dup else s[:idx] + s[idx + 1:])
+    codes[typo_rows] = len(table.strings) + typo_index
+
+    # Guardrail 43: Occasional completely empty text
+    codes[rng.random(n) < 0.08] = -1
+    return table.categorical(codes, typo_strings)
@@ -0,0 +1,114 @@
+"""
+Compact column types for the Ghost Reviews tables.
+
+Built from lists of dicts or object arrays, every string column is a Python
+object per row (60-70 bytes each) and every flag or count an int64. apply_schema
+converts a generated frame to TABLE_SCHEMAS, one column at a time:
+
+- Low-cardinality strings and repeated IDs (business, user) become categoricals,
+  i.e. integer codes into one dictionary of the distinct values.
+- Unique per-row IDs (review_id, journey_id, user_cookie), business names and
+  the noisy timestamps become Arrow-backed strings: one contiguous buffer plus
+  offsets, with the text unchanged in every output format.
+- Flags become int8/bool and counts int32.
+- float32 is used where the values carry at most ~6 significant digits (ratings,
+  scores, distances). Coordinates (6 decimals) and money keep float64.
+
+None of this changes what the CSV/Parquet outputs contain. schema_report
+measures bytes per row before and after for any set of frames.
+
+Measured at the scripts' default sizes, on the frames each engine builds:
+
+    table     engine                  before   after   reduction
+    reviews   loop                     175 B    52 B     3.4x
+    reviews   vectorized/presorted     301 B    52 B     5.8x
+    journeys  loop                     291 B   126 B     2.3x
+    journeys  vectorized               522 B   126 B     4.1x
+
+The loop engines fill ColumnBuffers, which already type part of their columns,
+so against them this falls short of the 4-8x target. Most of what is left is
+per-row text: review_id takes 18 B; on journeys, journey_id, user_cookie and
+journey_timestamp take 68 B together. Coordinates and money take another 32 B
+of float64. Getting below that would mean storing the IDs as integers and
+adding their prefixes only when writing, so every in-memory consumer (audits,
+sweep.py, run_pipeline callers) would see different values.
+"""
+import pandas as pd
+
+TABLE_SCHEMAS = {
+    'businesses': {
+        'business_id': 'category',
+        'business_name': 'string', # Mostly distinct names
+        'is_chain': 'bool',
+        'category': 'category',
+        'neighborhood': 'category',
+        'status': 'category',
+        'popularity_score': 'float32',
+        'review_count': 'int32',
+        'average_rating': 'float32',
+    },
+    'reviews': {
+        'review_id': 'string',
+        'business_id': 'category',
+        'user_id': 'category',
+        'review_date': 'category', # A few thousand distinct days, in their mixed output formats
+        'rating': 'float32',
+        'review_text': 'category',
+        'helpful_votes': 'int32',
+        'is_edited': 'int8',
+    },
+    'journeys': {
+        'journey_id': 'string',
+        'user_cookie': 'string',
+        'platform': 'category',
+        'journey_timestamp': 'string',
+        'search_category': 'category',
+        'distance_driven_km': 'float32',
+        'intended_biz_target': 'category',
+        'ghost_collision_event': 'int8',
+        'rage_quit_dropoff': 'int8',
+        'final_visited_biz': 'category',
+    },
+}
+
+# Arrow-backed, so the strings share one buffer instead of being an object each
+STRING_DTYPE = 'string[pyarrow]'
+
+
+def apply_schema(df, table):
+    """Converts the columns of `df` listed in TABLE_SCHEMAS[table] in place and returns `df`."""
+    for column, dtype in TABLE_SCHEMAS[table].items():
+        if column not in df.columns:
+            continue
+        values = df[column]
+        if dtype == 'category':
+            # Already typed dates are as compact as a categorical would be
+            if isinstance(values.dtype, pd.CategoricalDtype) or pd.api.types.is_datetime64_any_dtype(values):
+                continue
+            df[column] = values.astype('category')
+        elif dtype == 'string':
+            df[column] = values.astype(STRING_DTYPE)
+        elif dtype.startswith('int') and values.isna().any():
+            continue # Plain integer types can't hold the nulls injected into this column
+        else:
+            df[column] = values.astype(dtype)
+    return df
+
+
+def bytes_per_row(df):
+    """Deep memory footprint of `df` divided by its row count."""
+    return df.memory_usage(deep=True, index=False).sum() / max(len(df), 1)
+
+
+def schema_report(frames):
+    """
+    Bytes per row of each {table: frame} before and after apply_schema, as a
+    DataFrame. The frames themselves are left as they are.
+    """
+    rows = []
+    for table, df in frames.items():
+        before = bytes_per_row(df)
+        after = bytes_per_row(apply_schema(df.copy(deep=False), table))
+        rows.append({'table': table, 'rows': len(df), 'bytes_per_row_before': round(before, 1),
+                     'bytes_per_row_after': round(after, 1), 'reduction': round(before / after, 1)})
+    return pd.DataFrame(rows).set_index('table')
@@ -0,0 +1,110 @@
+"""
+Content-addressed cache for pipeline stage outputs.
+
+Every stage output is stored as Parquet under a key that hashes everything that
+determines it: the stage name, its config, the seed, the source of the code that
+builds it and the keys of the upstream stages it was built from. Changing a knob
+therefore only changes the key of that stage and of the stages downstream of it;
+everything else is read back instead of regenerated. Each entry has a JSON
+side-car recording what it was built from, and old entries are evicted by total
+size and/or age.
+"""
+import hashlib
+import json
+import os
+import time
+import warnings
+from pathlib import Path
+
+import pandas as pd
+
+from table_io import write_table
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+
+
+def code_version(file_names):
+    """Hash of the source files (relative to this directory) that build a stage."""
+    digest = hashlib.sha256()
+    for name in sorted(file_names):
+        digest.update(name.encode())
+        digest.update((SCRIPTS_DIR / name).read_bytes())
+    return digest.hexdigest()[:16]
+
+
+class StageCache:
+    """
+    Directory of <stage>-<key>.parquet entries plus their <stage>-<key>.json side-cars.
+
+    `max_bytes` caps the total size of the cache and `max_age_days` drops entries
+    that haven't been used for that long; either can be None. Reading an entry
+    refreshes its timestamp, so eviction removes the least recently used first.
+    """
+
+    def __init__(self, root, max_bytes=None, max_age_days=None):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, stage, config, seed, code, upstream=()):
+        """Hex key over the stage name, config, seed, code version and upstream keys."""
+        payload = json.dumps({'stage': stage, 'config': config, 'seed': seed, 'code': code, 'upstream': list(upstream)},
+                             sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+    def _path(self, stage, key):
+        return self.root / f"{stage}-{key}.parquet"
+
+    def load(self, stage, key):
+        """The cached frame, or None on a miss."""
+        path = self._path(stage, key)
+        if not path.exists():
+            self.misses += 1
+            return None
+        self.hits += 1
+        os.utime(path)
+        return pd.read_parquet(path)
+
+    def store(self, stage, key, df, provenance):
+        """Saves `df` with a side-car describing what it was built from, then evicts."""
+        path = self._path(stage, key)
+        # Written under a temporary name first, so an interrupted run never leaves a truncated entry behind
+        partial = write_table(df, self.root / f".{stage}-{key}.partial", 'parquet')
+        os.replace(partial, path)
+        path.with_suffix('.json').write_text(json.dumps(dict(provenance, stage=stage, key=key), indent=2, default=str))
+        self.evict(keep=path)
+
+    def evict(self, keep=None):
+        """
+        Drops entries older than `max_age_days`, then the oldest until under `max_bytes`.
+        The entry at `keep` (the one just stored) is never dropped: evicting it would
+        make its stage miss on every run. If it alone is over `max_bytes`, everything
+        else goes and a warning says the cap is too small.
+        """
+        # Hidden .<stage>-<key>.parquet files are entries another run is still writing
+        entries = sorted((p for p in self.root.glob('*.parquet') if p != keep and not p.name.startswith('.')),
+                         key=lambda p: p.stat().st_mtime)
+        if self.max_age_days is not None:
+            cutoff = time.time() - self.max_age_days * 86_400
+            expired = [p for p in entries if p.stat().st_mtime < cutoff]
+            for path in expired:
+                self._remove(path)
+            entries = entries[len(expired):]
+        if self.max_bytes is not None:
+            kept = keep.stat().st_size if keep is not None and keep.exists() else 0
+            total = kept + sum(p.stat().st_size for p in entries)
+            for path in entries:
+                if total <= self.max_bytes:
+                    break
+                total -= path.stat().st_size
+                self._remove(path)
+            if kept > self.max_bytes:
+                warnings.warn(f"Cache entry '{keep.name}' ({kept:,} bytes) alone exceeds max_bytes={self.max_bytes:,}; "
+                              f"kept on its own. Raise the cap to cache more than this entry.")
+
+    def _remove(self, path):
+        path.unlink(missing_ok=True)
+        path.with_suffix('.json').unlink(missing_ok=True)
@@ -0,0 +1,186 @@
+"""
+Parallel parameter sweeps over the Ghost Reviews simulation.
+
+Comparing scenarios used to mean editing constants in `2. Reviews.py` /
+`3. Customer Journey.py` and rerunning them one at a time. run_sweep takes a grid
+of those constants, generates and heals one business table (plus the user
+population and candidate index) that every scenario shares, runs the scenarios
+on a process pool and returns the audit metrics the scripts print as one
+comparison table, one row per scenario.
+
+Review knobs only affect reviews and journey knobs only affect journeys, so each
+distinct review setting and each distinct journey setting is simulated once and
+the results are joined per scenario. Every scenario uses the same seeds (common
+random numbers), so differences between rows come from the knobs, not from noise.
+Within a scenario each stage draws from its own stream, split from `seed` the
+way run_pipeline (pipeline.py) splits it.
+"""
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from business_engine import generate_businesses
+from date_parser import parse_mixed_dates
+from journey_engine import CandidateIndex, simulate_journeys
+from noise import apply_noise
+from review_engine import SPAM_BOT_PROBABILITY, UserPopulation, generate_reviews_sharded, review_noise_rules
+from table_io import heal_businesses
+
+# Sweepable constants, by their name in the scripts, mapped to the engine keyword they set
+REVIEW_PARAMETERS = {
+    'GHOST_REVIEW_PROBABILITY': 'ghost_review_probability',
+    'BURST_PROBABILITY': 'burst_probability',
+    'CONTRADICTION_PROBABILITY': 'contradiction_probability',
+    'SPAM_BOT_PROBABILITY': 'spam_bot_probability',
+}
+JOURNEY_PARAMETERS = {
+    'RAGE_QUIT_PROBABILITY': 'rage_quit_probability',
+    'CATEGORY_DEMAND_WEIGHTS': 'category_weights',
+}
+
+
+def parameter_grid(grid):
+    """Every combination of a {'CONSTANT': [values, ...]} grid, as a list of scenario dicts."""
+    unknown = set(grid) - set(REVIEW_PARAMETERS) - set(JOURNEY_PARAMETERS)
+    if unknown:
+        raise ValueError(f"Can't sweep {sorted(unknown)}; choose from {sorted(REVIEW_PARAMETERS) + sorted(JOURNEY_PARAMETERS)}.")
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def run_sweep(grid, num_businesses=2500, num_journeys=25000, seed=42, today=None, workers=1):
+    """
+    Runs every scenario of `grid` and returns the comparison table.
+
+    Parameter columns come first (dict values such as CATEGORY_DEMAND_WEIGHTS are
+    shown as text), followed by the review and journey audit metrics.
+    """
+    scenarios = parameter_grid(grid)
+    today = today or datetime.now() # One clock for every scenario
+
+    # One stream per stage, derived once and reused by every scenario
+    business_seed, user_seed, review_seed, journey_seed, review_noise_seed, _ = np.random.SeedSequence(seed).generate_state(6)
+    df_biz = heal_businesses(generate_businesses(num_businesses, seed=int(business_seed), today=today), today,
+                             rng=np.random.RandomState(int(user_seed)))
+    shared = {
+        'df_biz': df_biz,
+        'population': UserPopulation.build(int(len(df_biz) * 3), np.random.default_rng(user_seed)),
+        'index': CandidateIndex(df_biz),
+        'num_journeys': num_journeys,
+        'review_seed': int(review_seed),
+        'journey_seed': int(journey_seed),
+        'review_noise_seed': int(review_noise_seed),
+        'today': today,
+    }
+
+    review_knobs = [_knobs(s, REVIEW_PARAMETERS) for s in scenarios]
+    journey_knobs = [_knobs(s, JOURNEY_PARAMETERS) for s in scenarios]
+    review_settings, journey_settings = _distinct(review_knobs), _distinct(journey_knobs)
+    tasks = [('reviews', knobs) for knobs in review_settings] + [('journeys', knobs) for knobs in journey_settings]
+
+    if workers > 1 and len(tasks) > 1:
+        # Forked workers inherit the shared tables instead of unpickling them
+        context = multiprocessing.get_context('fork' if 'fork' in multiprocessing.get_all_start_methods() else None)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_sweep_worker, initargs=(shared,)) as pool:
+            results = list(pool.map(_run_task, tasks))
+    else:
+        _init_sweep_worker(shared)
+        results = [_run_task(task) for task in tasks]
+    review_metrics = dict(zip(map(_setting_key, review_settings), results[:len(review_settings)]))
+    journey_metrics = dict(zip(map(_setting_key, journey_settings), results[len(review_settings):]))
+
+    rows = []
+    for scenario, reviews, journeys in zip(scenarios, review_knobs, journey_knobs):
+        row = {name: str(value) if isinstance(value, dict) else value for name, value in scenario.items()}
+        row.update(review_metrics[_setting_key(reviews)])
+        row.update(journey_metrics[_setting_key(journeys)])
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def audit_reviews(df_reviews, df_biz):
+    """The review audit from `2. Reviews.py`, plus the share of reviews left after closure, as a dict."""
+    closure = df_biz.drop_duplicates('business_id').set_index('business_id')['closure_date']
+    review_dates, _ = parse_mixed_dates(df_reviews['review_date'])
+    after_closure = review_dates > df_reviews['business_id'].map(closure)
+    text = df_reviews['review_text'].astype(object)
+    per_user = df_reviews.groupby('user_id', observed=True).size()
+    return {
+        'reviews': len(df_reviews),
+        'ghost_review_pct': round(after_closure.mean() * 100, 2),
+        'null_rating_pct': round(df_reviews['rating'].isnull().mean() * 100, 2),
+        'max_helpful_votes': int(df_reviews['helpful_votes'].max()),
+        'median_helpful_votes': float(df_reviews['helpful_votes'].median()),
+        'avg_reviews_per_user': round(per_user.mean(), 1),
+        'top_user_reviews': int(per_user.max()),
+        'five_star_complaints': int(((df_reviews['rating'] == 5) & text.str.contains('Terrible|Awful|DO NOT', na=False, case=False)).sum()),
+        'spam_reviews': int(text.str.contains('Buy followers', na=False, case=False).sum()),
+    }
+
+
+def audit_journeys(df_journeys):
+    """The platform integrity audit from `3. Customer Journey.py`, as a dict."""
+    collided = df_journeys['ghost_collision_event'] == 1
+    return {
+        'journeys': len(df_journeys),
+        'capital_facilitated': round(df_journeys['economic_transaction_value'].sum(), 2),
+        'revenue_bleed': round(df_journeys['ecosystem_value_leaked'].sum(), 2),
+        'ghost_collision_pct': round(collided.mean() * 100, 1),
+        'rage_quit_pct': round(df_journeys.loc[collided, 'rage_quit_dropoff'].mean() * 100, 1),
+        'telemetry_loss': int(df_journeys['client_lat_origin'].isna().sum()),
+    }
+
+
+# Each worker process receives the shared tables once, not once per task
+_SHARED = None
+
+
+def _init_sweep_worker(shared):
+    global _SHARED
+    _SHARED = shared
+
+
+def _run_task(task):
+    stage, knobs = task
+    shared = _SHARED
+    if stage == 'journeys':
+        df_journeys = simulate_journeys(shared['index'], shared['num_journeys'], np.random.default_rng(shared['journey_seed']),
+                                        today=shared['today'], **knobs)
+        return audit_journeys(df_journeys)
+
+    knobs = dict(knobs)
+    spam_bot_probability = knobs.pop('spam_bot_probability', SPAM_BOT_PROBABILITY)
+    df_reviews = generate_reviews_sharded(shared['df_biz'], shared['population'], seed=shared['review_seed'], today=shared['today'], **knobs)
+    # The script's chaos pass, since its spam and lost ratings show up in the audit
+    rules = review_noise_rules(10000 + len(df_reviews), spam_bot_probability)
+    df_reviews = apply_noise(df_reviews, rules, np.random.default_rng(shared['review_noise_seed']))
+    return audit_reviews(df_reviews, shared['df_biz'])
+
+
+def _knobs(scenario, parameters):
+    """The engine keywords a scenario sets for one stage."""
+    return {parameters[name]: value for name, value in scenario.items() if name in parameters}
+
+
+def _setting_key(knobs):
+    return repr(sorted(knobs.items()))
+
+
+def _distinct(settings):
+    unique = {}
+    for knobs in settings:
+        unique.setdefault(_setting_key(knobs), knobs)
+    return list(unique.values())
+
+
+if __name__ == '__main__':
+    comparison = run_sweep({
+        'GHOST_REVIEW_PROBABILITY': [0.04, 0.08, 0.16],
+        'RAGE_QUIT_PROBABILITY': [0.2, 0.4, 0.6],
+    }, workers=2)
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        print(comparison)
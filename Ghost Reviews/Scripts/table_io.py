@@ -0,0 +1,181 @@
+"""
+Table I/O shared by the Ghost Reviews scripts.
+
+CSV stays the default so BI users can open every output directly, but at scale
+writing and re-parsing CSV costs more than generating the data. With
+fmt='parquet' a table is written as zstd-compressed, dictionary-encoded Parquet,
+optionally hive-partitioned (e.g. by neighborhood or review year), and the
+readers load only the columns a stage asks for, with the date columns already
+typed, so nothing is re-parsed between stages.
+
+Readers accept a single file, a partitioned dataset directory, or a directory of
+part files (see business_engine.write_business_parts). heal_businesses is the
+"self-healing" pass the downstream stages apply to the business table, whether it
+came from disk or straight from memory (see pipeline.py).
+"""
+import shutil
+from datetime import timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+FORMATS = ('csv', 'parquet')
+PARQUET_COMPRESSION = 'zstd'
+BUSINESS_DATE_COLUMNS = ('opening_date', 'closure_date')
+
+
+def write_table(df, path, fmt='csv', partition_cols=None):
+    """
+    Writes `df` to `path` as CSV or Parquet and returns the path written.
+
+    The suffix of `path` is replaced by the format's. `partition_cols` (Parquet
+    only) turns the output into a directory with one col=value folder per value.
+    Whatever was at `path` before (file or dataset directory) is replaced.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown output format '{fmt}', expected one of {FORMATS}.")
+    path = Path(path).with_suffix(f'.{fmt}')
+    if fmt == 'csv' and partition_cols:
+        raise ValueError("Partitioned output needs fmt='parquet'.")
+    _remove(path) # pyarrow adds partition files next to an old dataset's, so a rerun would duplicate every row
+    if fmt == 'csv':
+        df.to_csv(path, index=False)
+    else:
+        df.to_parquet(path, engine='pyarrow', index=False, compression=PARQUET_COMPRESSION,
+                      use_dictionary=True, partition_cols=list(partition_cols) if partition_cols else None)
+    return path
+
+
+class TableWriter:
+    """
+    Writes one table piece by piece, appended in order to a single CSV or Parquet
+    file (one row group per piece), for stages that stream their output. Use as a
+    context manager; `path` gets the format's suffix like in write_table.
+
+    With `partition_cols` (Parquet only) `path` is a dataset directory, as in
+    write_table: every piece adds one numbered part file to each col=value folder
+    it has rows for, so read_table reads the parts back in the order written.
+    Like write_table, the first piece replaces whatever was at `path` before.
+    """
+
+    def __init__(self, path, fmt='csv', partition_cols=None):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown output format '{fmt}', expected one of {FORMATS}.")
+        if fmt == 'csv' and partition_cols:
+            raise ValueError("Partitioned output needs fmt='parquet'.")
+        self.path = Path(path).with_suffix(f'.{fmt}')
+        self.fmt = fmt
+        self.partition_cols = list(partition_cols) if partition_cols else None
+        self.rows = 0
+        self.pieces = 0
+        self._parquet = None
+        self._schema = None
+
+    def write(self, df):
+        if self.pieces == 0:
+            _remove(self.path) # Including part files of an earlier, longer run
+        if self.fmt == 'csv':
+            df.to_csv(self.path, index=False, mode='w' if self.rows == 0 else 'a', header=self.rows == 0)
+        else:
+            import pyarrow as pa # Only needed for Parquet output
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._schema is None:
+                # Categoricals get int32 codes, so later pieces with larger dictionaries still fit
+                self._schema = pa.schema([
+                    field.with_type(pa.dictionary(pa.int32(), field.type.value_type)) if pa.types.is_dictionary(field.type) else field
+                    for field in table.schema
+                ], metadata=table.schema.metadata)
+            # Pieces can differ in inferred types (e.g. an all-null column), so they follow the first one's schema;
+            # each piece keeps its own dictionaries
+            table = table.select(self._schema.names).cast(self._schema)
+            if self.partition_cols:
+                pq.write_to_dataset(table, self.path, partition_cols=self.partition_cols, compression=PARQUET_COMPRESSION,
+                                    use_dictionary=True, basename_template=f'part-{self.pieces:05d}-{{i}}.parquet')
+            else:
+                if self._parquet is None:
+                    self._parquet = pq.ParquetWriter(self.path, self._schema, compression=PARQUET_COMPRESSION, use_dictionary=True)
+                self._parquet.write_table(table)
+        self.rows += len(df)
+        self.pieces += 1
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+            self._parquet = None
+        return self.path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _remove(path):
+    """Deletes the file or directory tree at `path`, if there is one."""
+    if path.is_dir():
+        shutil.rmtree(path)
+    elif path.exists():
+        path.unlink()
+
+
+def read_table(path, columns=None):
+    """
+    Reads a table written by write_table. Only `columns` are loaded when given;
+    names the source doesn't have are skipped, so callers can still fill them in.
+    """
+    path = Path(path)
+    if path.is_dir():
+        files = sorted(f for f in path.rglob('*') if f.suffix in ('.csv', '.parquet'))
+        if not files:
+            raise FileNotFoundError(f"No .csv or .parquet files under '{path}'.")
+    elif path.exists():
+        files = [path]
+    else:
+        raise FileNotFoundError(path)
+
+    if files[0].suffix == '.parquet':
+        import pyarrow.dataset as ds # Only needed for Parquet input
+        dataset = ds.dataset(path, format='parquet', partitioning='hive')
+        names = dataset.schema.names if columns is None else [c for c in columns if c in dataset.schema.names]
+        return dataset.to_table(columns=names).to_pandas()
+
+    usecols = None if columns is None else (lambda c: c in columns)
+    frames = [pd.read_csv(f, usecols=usecols) for f in files]
+    return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+
+
+def read_businesses(path, columns=None):
+    """
+    Business table with opening/closure dates as datetime64. Parquet input already
+    carries the types; CSV dates are parsed here, with broken values as NaT.
+    """
+    df = read_table(path, columns)
+    for col in BUSINESS_DATE_COLUMNS:
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+    return df
+
+
+def heal_businesses(df_biz, today, rng=np.random):
+    """
+    Self-heals missing business data constraints in place and returns `df_biz`.
+
+    `rng` draws the stand-in review stats. It takes the legacy `np.random` API so
+    the scripts keep consuming their global seed exactly as before.
+    """
+    # If dates are entirely broken or missing, default to reasonable constraints
+    df_biz['opening_date'] = pd.to_datetime(df_biz['opening_date']).fillna(pd.to_datetime(today - timedelta(days=1000)))
+    df_biz['closure_date'] = pd.to_datetime(df_biz['closure_date'])
+
+    # Handle missing stats from parent dataset gently
+    if 'review_count' not in df_biz.columns:
+        df_biz['review_count'] = rng.randint(1, 50, size=len(df_biz))
+    df_biz['review_count'] = df_biz['review_count'].fillna(rng.randint(1, 10)).astype(int)
+
+    if 'average_rating' not in df_biz.columns:
+        df_biz['average_rating'] = rng.uniform(2.0, 5.0, size=len(df_biz))
+    df_biz['average_rating'] = pd.to_numeric(df_biz['average_rating'], errors='coerce').fillna(3.5).astype(float)
+    return df_biz
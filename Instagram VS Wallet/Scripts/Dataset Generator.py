@@ -1,10 +1,20 @@
+import numpy as np
 import pandas as pd
 import random
-from faker import Faker
 from datetime import datetime, timedelta
+import sys
+from pathlib import Path
 
-# Initialize Faker
-fake = Faker()
+# Shared helpers live in Shared/ at the repository root
+sys.path.append(str(Path(__file__).resolve().parents[2] / "Shared"))
+from excel_export import export_sheets
+from faker_pool import FakerPool
+from instrument import span  # Phase timings, switched on by GENERATOR_* environment variables
+
+from commerce_engine import generate_tables
+
+# Seeded, disk-cached pools of Faker values, drawn a whole column at a time
+fake_pool = FakerPool(seed=42)
 
 # Parameters
 num_products = 10000
@@ -13,69 +23,90 @@ num_resales = 20000
 num_surveys = 5000
 start_date = datetime(2022, 1, 1)
 end_date = datetime(2023, 12, 31)
+# 'loop' builds the tables row by row below (the readable reference); 'vectorized' draws whole
+# columns via commerce_engine.generate_tables: integer product keys, day offsets, bulk IDs and
+# resales tied to a real purchase, built for 100M+ transactions
+engine = 'loop'
+demographics = 'string'  # vectorized only: 'string' as the loop writes it, 'columns' for age/city/income, or 'both'
+sidecar_format = None  # 'csv' or 'parquet' also writes every sheet to its own file; sheets past Excel's row limit always get one
 
 # Helper Functions
 def random_date(start, end):
     return start + timedelta(days=random.randint(0, (end - start).days))
 
-# 1. Products Table
-products = []
-categories = ["Electronics", "Clothing", "Home & Kitchen", "Beauty", "Sports"]
-for i in range(1, num_products + 1):
-    products.append({
-        "product_id": f"P{i:05}",
-        "product_name": fake.word().capitalize(),
-        "product_category": random.choice(categories),
-        "price": round(random.uniform(5, 500), 2)
-    })
-products_df = pd.DataFrame(products)
+generation = span("generation loop").start()
+if engine == 'vectorized':
+    tables = generate_tables(num_products, num_transactions, num_resales, num_surveys, start_date, end_date,
+                             seed=42, demographics=demographics, pool=fake_pool)
+else:
+    # 1. Products Table
+    products = []
+    product_names = fake_pool.draw('word', num_products)
+    categories = ["Electronics", "Clothing", "Home & Kitchen", "Beauty", "Sports"]
+    for i in range(1, num_products + 1):
+        products.append({
+            "product_id": f"P{i:05}",
+            "product_name": product_names[i - 1].capitalize(),
+            "product_category": random.choice(categories),
+            "price": round(random.uniform(5, 500), 2)
+        })
+    products_df = pd.DataFrame(products)
 
-# 2. Transactions Table
-transactions = []
-for i in range(1, num_transactions + 1):
-    transactions.append({
-        "transaction_id": f"T{i:06}",
-        "product_id": random.choice(products_df["product_id"]),
-        "purchase_date": random_date(start_date, end_date).strftime("%Y-%m-%d"),
-        "amount": round(random.uniform(5, 500), 2),
-        "payment_method": random.choice(["Credit Card", "PayPal", "Cash"]),
-        "customer_demographics": f"{random.randint(18, 65)} years, {fake.city()}, {fake.random_element(['Low', 'Medium', 'High'])} Income"
-    })
-transactions_df = pd.DataFrame(transactions)
+    # 2. Transactions Table
+    transactions = []
+    transaction_cities = fake_pool.draw('city', num_transactions)
+    transaction_incomes = np.random.choice(['Low', 'Medium', 'High'], num_transactions)
+    for i in range(1, num_transactions + 1):
+        transactions.append({
+            "transaction_id": f"T{i:06}",
+            "product_id": random.choice(products_df["product_id"]),
+            "purchase_date": random_date(start_date, end_date).strftime("%Y-%m-%d"),
+            "amount": round(random.uniform(5, 500), 2),
+            "payment_method": random.choice(["Credit Card", "PayPal", "Cash"]),
+            "customer_demographics": f"{random.randint(18, 65)} years, {transaction_cities[i - 1]}, {transaction_incomes[i - 1]} Income"
+        })
+    transactions_df = pd.DataFrame(transactions)
 
-# 3. Resale and Return Table
-resales = []
-for i in range(1, num_resales + 1):
-    resales.append({
-        "resale_id": f"R{i:06}",
-        "product_id": random.choice(products_df["product_id"]),
-        "resale_date": random_date(start_date, end_date).strftime("%Y-%m-%d"),
-        "resale_amount": round(random.uniform(5, 400), 2),
-        "return_id": f"RT{i:06}",
-        "return_date": random_date(start_date, end_date).strftime("%Y-%m-%d"),
-        "return_reason": random.choice(["Defective", "Not as described", "Changed mind"])
-    })
-resales_df = pd.DataFrame(resales)
+    # 3. Resale and Return Table
+    resales = []
+    for i in range(1, num_resales + 1):
+        resales.append({
+            "resale_id": f"R{i:06}",
+            "product_id": random.choice(products_df["product_id"]),
+            "resale_date": random_date(start_date, end_date).strftime("%Y-%m-%d"),
+            "resale_amount": round(random.uniform(5, 400), 2),
+            "return_id": f"RT{i:06}",
+            "return_date": random_date(start_date, end_date).strftime("%Y-%m-%d"),
+            "return_reason": random.choice(["Defective", "Not as described", "Changed mind"])
+        })
+    resales_df = pd.DataFrame(resales)
 
-# 4. User Surveys Table
-surveys = []
-for i in range(1, num_surveys + 1):
-    surveys.append({
-        "survey_id": f"S{i:05}",
-        "product_id": random.choice(products_df["product_id"]),
-        "purchase_motivation": random.choice(["Price", "Trend", "Recommendation"]),
-        "regret_level": random.choice(["Low", "Medium", "High"]),
-        "satisfaction": random.choice(["Satisfied", "Neutral", "Dissatisfied"]),
-        "demographic_data": f"{random.randint(18, 65)} years, {fake.city()}, {fake.random_element(['Low', 'Medium', 'High'])} Income"
-    })
-surveys_df = pd.DataFrame(surveys)
+    # 4. User Surveys Table
+    surveys = []
+    survey_cities = fake_pool.draw('city', num_surveys)
+    survey_incomes = np.random.choice(['Low', 'Medium', 'High'], num_surveys)
+    for i in range(1, num_surveys + 1):
+        surveys.append({
+            "survey_id": f"S{i:05}",
+            "product_id": random.choice(products_df["product_id"]),
+            "purchase_motivation": random.choice(["Price", "Trend", "Recommendation"]),
+            "regret_level": random.choice(["Low", "Medium", "High"]),
+            "satisfaction": random.choice(["Satisfied", "Neutral", "Dissatisfied"]),
+            "demographic_data": f"{random.randint(18, 65)} years, {survey_cities[i - 1]}, {survey_incomes[i - 1]} Income"
+        })
+    surveys_df = pd.DataFrame(surveys)
+    tables = {
+        "Products": products_df,
+        "Transactions": transactions_df,
+        "Resale & Return": resales_df,
+        "User Surveys": surveys_df,
+    }
+generation.stop(rows=sum(len(df) for df in tables.values()))
 
-# Save to Excel with multiple sheets
-file_path = r"C:\Users\ASUS\Videos\OCR Table\dataset.xlsx"
-with pd.ExcelWriter(file_path, engine='xlsxwriter') as writer:
-    products_df.to_excel(writer, sheet_name="Products", index=False)
-    transactions_df.to_excel(writer, sheet_name="Transactions", index=False)
-    resales_df.to_excel(writer, sheet_name="Resale & Return", index=False)
-    surveys_df.to_excel(writer, sheet_name="User Surveys", index=False)
+# Save to Excel with multiple sheets, streamed to disk a chunk of rows at a time
+# Relative to where the script is run (other sizes and formats: Shared/generate_datasets.py instagram)
+file_path = "dataset.xlsx"
+with span("write", rows=sum(len(df) for df in tables.values())):
+    export_sheets(tables, file_path, sidecar=sidecar_format)
 
 print(f"Dataset created and saved successfully at {file_path}!")
@@ -0,0 +1,254 @@
+"""
+Vectorized engine for the Instagram VS Wallet transaction tables.
+
+`Dataset Generator.py` builds Transactions, Resale & Return and User Surveys one
+row at a time: every row indexes the product Series with random.choice, formats
+its ID and date with Python strings and writes its demographics as one
+"34 years, <city>, Medium Income" string. That is fine for 100k rows and hours
+for 100M. This engine draws each table a column at a time:
+
+- Products are referenced by integer row numbers and stored as a categorical
+  over the product IDs, so a foreign key costs 4 bytes, not a string.
+- Dates are day offsets from the start date, turned into datetime64 in one step.
+- IDs are written straight into an Arrow string buffer (format_ids).
+- Demographics are structured columns (customer_age, customer_city,
+  customer_income), with the composed string of the loop as an option.
+
+Every resale comes from a transaction (transaction_id): it carries that
+transaction's product, its resale date falls on or after the purchase date and
+its return date on or after the resale date, so resales always join back to a
+real purchase in the right order. While there are at least as many transactions
+as resales, no transaction is resold twice. The loop draws these independently.
+
+Transactions, resales and surveys are generated in chunks of `chunk_size` rows,
+each with its own seed stream; only the product and purchase day of every
+transaction (6 bytes a row) and the source transaction of every resale (4 bytes)
+are held for the whole run, so write_table_parts can stream 100M transactions to
+disk.
+"""
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Shared helpers live in Shared/ at the repository root
+sys.path.append(str(Path(__file__).resolve().parents[2] / 'Shared'))
+from faker_pool import FakerPool
+
+CATEGORIES = ["Electronics", "Clothing", "Home & Kitchen", "Beauty", "Sports"]
+PAYMENT_METHODS = ["Credit Card", "PayPal", "Cash"]
+RETURN_REASONS = ["Defective", "Not as described", "Changed mind"]
+MOTIVATIONS = ["Price", "Trend", "Recommendation"]
+REGRET_LEVELS = ["Low", "Medium", "High"]
+SATISFACTION_LEVELS = ["Satisfied", "Neutral", "Dissatisfied"]
+INCOME_LEVELS = ["Low", "Medium", "High"]
+MIN_AGE, MAX_AGE = 18, 65
+
+# 'string' writes the loop's composed demographics column, 'columns' the structured ones, 'both' all four
+DEMOGRAPHICS = ('string', 'columns', 'both')
+
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+# Table names, as the workbook sheets are called
+TABLES = ('Products', 'Transactions', 'Resale & Return', 'User Surveys')
+
+# Rows per table at scale 1, the sizes `Dataset Generator.py` uses
+TABLE_SIZES = {'Products': 10000, 'Transactions': 100000, 'Resale & Return': 20000, 'User Surveys': 5000}
+
+
+def table_rows(scale=1.0):
+    """Row count of each table at `scale` (every table grows linearly), without building anything."""
+    return {table: max(1, int(round(rows * scale))) for table, rows in TABLE_SIZES.items()}
+
+
+def generate_tables(num_products, num_transactions, num_resales, num_surveys, start_date, end_date, seed=42,
+                    demographics='string', pool=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Builds all four tables in memory, as {table name: DataFrame} in TABLES order."""
+    chunks = {table: [] for table in TABLES}
+    for table, chunk in iter_table_chunks(num_products, num_transactions, num_resales, num_surveys, start_date, end_date,
+                                          seed=seed, demographics=demographics, pool=pool, chunk_size=chunk_size):
+        chunks[table].append(chunk)
+    return {table: pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0] for table, parts in chunks.items()}
+
+
+def iter_table_chunks(num_products, num_transactions, num_resales, num_surveys, start_date, end_date, seed=42,
+                      demographics='string', pool=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yields (table name, chunk) pairs: the products in one chunk, then the
+    transactions, resales and surveys in chunks of at most `chunk_size` rows.
+    """
+    if demographics not in DEMOGRAPHICS:
+        raise ValueError(f"Unknown demographics '{demographics}'; use one of {DEMOGRAPHICS}.")
+    pool = pool if pool is not None else FakerPool(seed=seed)
+    product_seed, key_seed, transaction_seed, resale_seed, survey_seed = np.random.SeedSequence(seed).spawn(5)
+    num_days = (end_date - start_date).days + 1 # Both ends included, as in the loop's random_date
+    start_day = np.datetime64(start_date.date() if isinstance(start_date, datetime) else start_date, 'D')
+
+    products = _products(num_products, np.random.default_rng(product_seed), pool)
+    yield 'Products', products
+    product_ids = pd.Index(products['product_id'].astype(object))
+
+    # The keys the resales join on, drawn once for every transaction
+    key_rng = np.random.default_rng(key_seed)
+    transaction_products = key_rng.integers(0, num_products, size=num_transactions, dtype=np.int32)
+    purchase_days = key_rng.integers(0, num_days, size=num_transactions, dtype=np.int16 if num_days < 2**15 else np.int32)
+    # Resale sources without replacement, so no purchase is resold (and returned) twice; only
+    # with more resales than transactions does each chunk draw its sources with replacement
+    resale_sources = None
+    if num_resales <= num_transactions:
+        order = np.arange(num_transactions, dtype=np.int32 if num_transactions < 2**31 else np.int64)
+        key_rng.shuffle(order)
+        resale_sources = order[:num_resales].copy()
+        del order
+
+    for rng, start, count in _chunks(transaction_seed, num_transactions, chunk_size):
+        yield 'Transactions', pd.DataFrame({
+            'transaction_id': format_ids('T', start + 1, count, 6),
+            'product_id': pd.Categorical.from_codes(transaction_products[start:start + count], categories=product_ids),
+            'purchase_date': _dates(start_day, purchase_days[start:start + count]),
+            'amount': rng.uniform(5, 500, size=count).round(2),
+            'payment_method': _choice(rng, PAYMENT_METHODS, count),
+            **_demographics(rng, pool, count, demographics, 'customer'),
+        })
+
+    for rng, start, count in _chunks(resale_seed, num_resales, chunk_size):
+        if resale_sources is not None:
+            source = resale_sources[start:start + count].astype(np.int64)
+        else:
+            source = rng.integers(0, num_transactions, size=count)
+        purchased = purchase_days[source].astype(np.int32)
+        resold = purchased + _days_after(rng, purchased, num_days)
+        yield 'Resale & Return', pd.DataFrame({
+            'resale_id': format_ids('R', start + 1, count, 6),
+            'transaction_id': _id_strings('T', source + 1, 6),
+            'product_id': pd.Categorical.from_codes(transaction_products[source], categories=product_ids),
+            'resale_date': _dates(start_day, resold),
+            'resale_amount': rng.uniform(5, 400, size=count).round(2),
+            'return_id': format_ids('RT', start + 1, count, 6),
+            'return_date': _dates(start_day, resold + _days_after(rng, resold, num_days)),
+            'return_reason': _choice(rng, RETURN_REASONS, count),
+        })
+
+    for rng, start, count in _chunks(survey_seed, num_surveys, chunk_size):
+        yield 'User Surveys', pd.DataFrame({
+            'survey_id': format_ids('S', start + 1, count, 5),
+            'product_id': pd.Categorical.from_codes(rng.integers(0, num_products, size=count), categories=product_ids),
+            'purchase_motivation': _choice(rng, MOTIVATIONS, count),
+            'regret_level': _choice(rng, REGRET_LEVELS, count),
+            'satisfaction': _choice(rng, SATISFACTION_LEVELS, count),
+            **_demographics(rng, pool, count, demographics, 'demographic'),
+        })
+
+
+def write_table_parts(output_dir, num_products, num_transactions, num_resales, num_surveys, start_date, end_date,
+                      seed=42, demographics='string', fmt='parquet', chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Streams every table to `output_dir`/<table>/part-NNNNN.csv (or .parquet), one
+    part per chunk, so memory is set by `chunk_size` (plus the 6-byte join keys of
+    every transaction and the 4-byte source of every resale). Returns {table name:
+    [part paths]}.
+    """
+    if fmt not in ('csv', 'parquet'):
+        raise ValueError(f"Unknown format '{fmt}'; use 'csv' or 'parquet'.")
+    paths = {table: [] for table in TABLES}
+    for table, chunk in iter_table_chunks(num_products, num_transactions, num_resales, num_surveys, start_date, end_date,
+                                          seed=seed, demographics=demographics, chunk_size=chunk_size):
+        folder = Path(output_dir) / table.lower().replace(' & ', '_').replace(' ', '_')
+        folder.mkdir(parents=True, exist_ok=True)
+        path = folder / f'part-{len(paths[table]):05d}.{fmt}'
+        if fmt == 'parquet':
+            chunk.to_parquet(path, index=False)
+        else:
+            chunk.to_csv(path, index=False)
+        paths[table].append(path)
+    return paths
+
+
+def format_ids(prefix, start, count, width):
+    """
+    `count` consecutive IDs from `start`, zero-padded to at least `width` digits
+    (f'{prefix}{i:0{width}}'), as an Arrow-backed string array built without a
+    Python string per ID.
+    """
+    numbers = np.arange(start, start + count, dtype=np.int64)
+    return _id_strings(prefix, numbers, width)
+
+
+def _id_strings(prefix, numbers, width):
+    """Formats any int64 `numbers` as IDs; values with the same digit count share one fixed-width block."""
+    head = np.frombuffer(prefix.encode(), dtype=np.uint8)
+    numbers = numbers.astype(np.int64)
+    digits = np.maximum(width, np.searchsorted(10 ** np.arange(1, 19, dtype=np.int64), numbers, side='right') + 1)
+    lengths = len(head) + digits
+    offsets = np.zeros(len(numbers) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    data = np.empty(offsets[-1], dtype=np.uint8)
+    for size in np.unique(digits):
+        rows = np.flatnonzero(digits == size)
+        chars = np.empty((len(rows), len(head) + size), dtype=np.uint8)
+        chars[:, :len(head)] = head
+        rest = numbers[rows]
+        for k in range(size):
+            chars[:, len(head) + size - 1 - k] = 48 + rest % 10
+            rest = rest // 10
+        if len(rows) == len(numbers):
+            data = chars.ravel() # One width: the block already is the buffer
+        else:
+            # Scatter each row's characters to where its ID starts in the shared buffer
+            data[(offsets[rows][:, None] + np.arange(chars.shape[1])).ravel()] = chars.ravel()
+    strings = pa.LargeStringArray.from_buffers(len(numbers), pa.py_buffer(offsets), pa.py_buffer(data))
+    return pd.arrays.ArrowStringArray(strings.cast(pa.string()))
+
+
+def _products(num_products, rng, pool):
+    codes, words = pool.draw_codes('word', num_products, rng=rng)
+    names = pd.Series(words).str.capitalize().to_numpy(dtype=object)
+    return pd.DataFrame({
+        'product_id': format_ids('P', 1, num_products, 5),
+        'product_name': names[codes],
+        'product_category': _choice(rng, CATEGORIES, num_products),
+        'price': rng.uniform(5, 500, size=num_products).round(2),
+    })
+
+
+def _demographics(rng, pool, count, demographics, prefix):
+    """Age, city and income columns and/or the loop's '<age> years, <city>, <income> Income' column."""
+    age = rng.integers(MIN_AGE, MAX_AGE + 1, size=count, dtype=np.int8)
+    city_codes, cities = pool.draw_codes('city', count, rng=rng)
+    income = rng.integers(0, len(INCOME_LEVELS), size=count, dtype=np.int8)
+    columns = {}
+    if demographics in ('string', 'both'):
+        # Joined by Arrow from the three lookups, so no Python string is built per row
+        ages = pa.array([str(a) for a in range(MIN_AGE, MAX_AGE + 1)]).take(pa.array(age - MIN_AGE))
+        text = pc.binary_join_element_wise(ages, ' years, ', pa.array(cities.tolist()).take(pa.array(city_codes)), ', ',
+                                           pa.array(INCOME_LEVELS).take(pa.array(income)), ' Income', '')
+        columns[f'{prefix}_demographics' if prefix == 'customer' else 'demographic_data'] = pd.arrays.ArrowStringArray(text)
+    if demographics in ('columns', 'both'):
+        columns[f'{prefix}_age'] = age
+        columns[f'{prefix}_city'] = pd.Categorical.from_codes(city_codes, categories=pd.Index(cities))
+        columns[f'{prefix}_income'] = pd.Categorical.from_codes(income, categories=INCOME_LEVELS)
+    return columns
+
+
+def _chunks(seed_sequence, total, chunk_size):
+    """(rng, start, count) for each chunk of a table, with one spawned seed stream per chunk."""
+    starts = range(0, total, chunk_size)
+    for start, chunk_seed in zip(starts, seed_sequence.spawn(len(starts))):
+        yield np.random.default_rng(chunk_seed), start, min(chunk_size, total - start)
+
+
+def _choice(rng, labels, count):
+    return pd.Categorical.from_codes(rng.integers(0, len(labels), size=count, dtype=np.int8), categories=labels)
+
+
+def _days_after(rng, days, num_days):
+    """A uniform number of days from each of `days` up to the last day of the window, both included."""
+    return (rng.random(len(days)) * (num_days - days)).astype(np.int32)
+
+
+def _dates(start_day, offsets):
+    return (start_day + offsets.astype('timedelta64[D]')).astype('datetime64[ns]')
@@ -1,53 +1,27 @@
-import pandas as pd
-import numpy as np
+import sys
+from pathlib import Path
 
-# File path
-file_path = r"C:\Users\ASUS\Videos\OCR Table\urban_parking_dataset.xlsx"
+# Shared helpers live in Shared/ at the repository root
+sys.path.append(str(Path(__file__).resolve().parents[2] / "Shared"))
+from excel_export import export_sheets
+from instrument import span  # Phase timings, switched on by GENERATOR_* environment variables
 
-# Dataset Parameters
-days_in_year = 365
-transactions_per_day = 200  # Adjusted number of daily transactions
-total_transactions = days_in_year * transactions_per_day
-
-# Generate sample data
-parking_spots_df = pd.DataFrame({
-    "ID": range(1, 10001),
-    "Location": np.random.choice(["Downtown", "Suburb", "Airport"], 10000),
-    "Capacity": np.random.randint(10, 100, 10000),
-    "Type": np.random.choice(["On-street", "Off-street", "Handicapped"], 10000),
-    "Availability": np.random.choice([True, False], 10000)
-})
+from parking_engine import generate_tables
 
-predictive_df = pd.DataFrame({
-    "Date": pd.date_range(start="2023-01-01", periods=days_in_year),
-    "Time": np.random.choice(["Morning", "Afternoon", "Evening", "Night"], days_in_year),
-    "Forecasted Demand": np.random.randint(50, 500, days_in_year),
-    "Confidence Interval": [f"{x}-{x+10}" for x in np.random.randint(50, 490, days_in_year)],
-    "Event": np.random.choice(["Concert", "Sports Game", "Festival", "None"], days_in_year),
-    "Weather": np.random.choice(["Sunny", "Rainy", "Snowy"], days_in_year)
-})
+# File path, relative to where the script is run (other sizes and formats: Shared/generate_datasets.py parking)
+file_path = "urban_parking_dataset.xlsx"
+sidecar_format = None  # 'csv' or 'parquet' also writes every sheet to its own file; sheets past Excel's row limit always get one
 
-driver_behavior_df = pd.DataFrame({
-    "ID": range(1, 1001),
-    "Search Time": np.random.randint(1, 30, 1000),
-    "Fuel Consumption": np.random.uniform(0.1, 2.5, 1000).round(2),
-    "Parking Preference": np.random.choice(["Closest", "Cheapest"], 1000),
-    "Payment Method": np.random.choice(["Credit Card", "PayPal", "Cash"], 1000)
-})
+# Dataset Parameters
+transactions_per_day = 200  # Adjusted number of daily transactions
 
-revenue_df = pd.DataFrame({
-    "Date": pd.date_range(start="2023-01-01", periods=days_in_year).repeat(transactions_per_day),
-    "Time": np.random.choice(["Morning", "Afternoon", "Evening", "Night"], total_transactions),
-    "Transaction Amount": np.random.uniform(5, 50, total_transactions).round(2),
-    "Payment Method": np.random.choice(["Credit Card", "PayPal", "Cash"], total_transactions),
-    "Revenue Stream": np.random.choice(["Parking Fees", "Advertising"], total_transactions)
-})
+# Generate sample data: parking spots, predictive analytics, driver behavior and revenue (see parking_engine.py)
+with span("generation loop") as generation:
+    tables = generate_tables(transactions_per_day=transactions_per_day)
+    generation.rows = sum(len(df) for df in tables.values())
 
-# Save data to Excel
-with pd.ExcelWriter(file_path, engine='xlsxwriter') as writer:
-    parking_spots_df.to_excel(writer, sheet_name="Parking Spots", index=False)
-    predictive_df.to_excel(writer, sheet_name="Predictive Analytics", index=False)
-    driver_behavior_df.to_excel(writer, sheet_name="Driver Behavior", index=False)
-    revenue_df.to_excel(writer, sheet_name="Revenue Data", index=False)
+# Save data to Excel, streamed to disk a chunk of rows at a time
+with span("write", rows=generation.rows):
+    export_sheets(tables, file_path, sidecar=sidecar_format)
 
 print(f"Urban Parking Optimization dataset created and saved successfully at {file_path}!")
@@ -0,0 +1,93 @@
+"""
+Table builder for the Urban Parking Optimization dataset.
+
+`Dataset Generator.py` calls generate_tables at its default size, and the
+command-line entry point (Shared/generate_datasets.py) calls it with a scale
+factor. Scaling is linear: parking spots, drivers and daily transactions grow
+with `scale`, while the daily forecast stays one row per calendar day.
+Repeated labels come out as categoricals rather than one string per row.
+"""
+import numpy as np
+import pandas as pd
+
+NUM_PARKING_SPOTS = 10000
+NUM_DRIVERS = 1000
+DAYS_IN_YEAR = 365
+TRANSACTIONS_PER_DAY = 200
+START_DATE = "2023-01-01"
+
+LOCATIONS = ["Downtown", "Suburb", "Airport"]
+SPOT_TYPES = ["On-street", "Off-street", "Handicapped"]
+TIMES_OF_DAY = ["Morning", "Afternoon", "Evening", "Night"]
+EVENTS = ["Concert", "Sports Game", "Festival", "None"]
+WEATHER = ["Sunny", "Rainy", "Snowy"]
+PARKING_PREFERENCES = ["Closest", "Cheapest"]
+PAYMENT_METHODS = ["Credit Card", "PayPal", "Cash"]
+REVENUE_STREAMS = ["Parking Fees", "Advertising"]
+
+
+def table_rows(scale=1.0, transactions_per_day=TRANSACTIONS_PER_DAY):
+    """Row count of each sheet at `scale`, without building anything."""
+    return {
+        "Parking Spots": _scaled(NUM_PARKING_SPOTS, scale),
+        "Predictive Analytics": DAYS_IN_YEAR,
+        "Driver Behavior": _scaled(NUM_DRIVERS, scale),
+        "Revenue Data": DAYS_IN_YEAR * _scaled(transactions_per_day, scale),
+    }
+
+
+def generate_tables(scale=1.0, seed=None, transactions_per_day=TRANSACTIONS_PER_DAY):
+    """Builds the four sheets as {sheet name: DataFrame}. `seed=None` draws fresh data every run."""
+    rng = np.random.default_rng(seed)
+    num_spots = _scaled(NUM_PARKING_SPOTS, scale)
+    num_drivers = _scaled(NUM_DRIVERS, scale)
+    daily = _scaled(transactions_per_day, scale)
+    total_transactions = DAYS_IN_YEAR * daily
+
+    parking_spots_df = pd.DataFrame({
+        "ID": np.arange(1, num_spots + 1),
+        "Location": _choice(rng, LOCATIONS, num_spots),
+        "Capacity": rng.integers(10, 100, num_spots),
+        "Type": _choice(rng, SPOT_TYPES, num_spots),
+        "Availability": rng.random(num_spots) < 0.5,
+    })
+
+    predictive_df = pd.DataFrame({
+        "Date": pd.date_range(start=START_DATE, periods=DAYS_IN_YEAR),
+        "Time": _choice(rng, TIMES_OF_DAY, DAYS_IN_YEAR),
+        "Forecasted Demand": rng.integers(50, 500, DAYS_IN_YEAR),
+        "Confidence Interval": [f"{x}-{x+10}" for x in rng.integers(50, 490, DAYS_IN_YEAR)],
+        "Event": _choice(rng, EVENTS, DAYS_IN_YEAR),
+        "Weather": _choice(rng, WEATHER, DAYS_IN_YEAR),
+    })
+
+    driver_behavior_df = pd.DataFrame({
+        "ID": np.arange(1, num_drivers + 1),
+        "Search Time": rng.integers(1, 30, num_drivers),
+        "Fuel Consumption": rng.uniform(0.1, 2.5, num_drivers).round(2),
+        "Parking Preference": _choice(rng, PARKING_PREFERENCES, num_drivers),
+        "Payment Method": _choice(rng, PAYMENT_METHODS, num_drivers),
+    })
+
+    revenue_df = pd.DataFrame({
+        "Date": pd.date_range(start=START_DATE, periods=DAYS_IN_YEAR).repeat(daily),
+        "Time": _choice(rng, TIMES_OF_DAY, total_transactions),
+        "Transaction Amount": rng.uniform(5, 50, total_transactions).round(2),
+        "Payment Method": _choice(rng, PAYMENT_METHODS, total_transactions),
+        "Revenue Stream": _choice(rng, REVENUE_STREAMS, total_transactions),
+    })
+
+    return {
+        "Parking Spots": parking_spots_df,
+        "Predictive Analytics": predictive_df,
+        "Driver Behavior": driver_behavior_df,
+        "Revenue Data": revenue_df,
+    }
+
+
+def _scaled(base, scale):
+    return max(1, int(round(base * scale)))
+
+
+def _choice(rng, labels, count):
+    return pd.Categorical.from_codes(rng.integers(0, len(labels), count, dtype=np.int8), categories=labels)
@@ -0,0 +1,151 @@
+"""
+Vectorized builder for the Pet Wellness Tracker dataset.
+
+`Pet Wellness Tracker Dataset.ipynb` builds each table with a list
+comprehension per column (random.choice and a Faker call per row). That is the
+readable reference; this module draws every column at once with NumPy so the
+command-line entry point (Shared/generate_datasets.py) can scale the dataset.
+Every table grows linearly with `scale`.
+
+- Names and recommendation texts come from seeded Faker pools
+  (Shared/faker_pool.py).
+- "This year" dates and timestamps are drawn uniformly between January 1 and
+  `today`, as Faker's date_this_year / date_time_this_year do.
+- A pet's breed is drawn for its own species; the notebook draws the breed
+  from a second, independent species draw.
+"""
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Shared helpers live in Shared/ at the repository root
+sys.path.append(str(Path(__file__).resolve().parents[2] / 'Shared'))
+from faker_pool import FakerPool
+
+# Rows per table at scale 1, as in the notebook
+TABLE_SIZES = {
+    'Pets': 1000,
+    'Wellness Data': 1000,
+    'IoT Device Data': 500,
+    'Veterinary Records': 2000,
+    'Predictive Alerts': 1500,
+    'Recommendations': 1000,
+}
+
+HEALTH_CONDITIONS = ["None", "Allergies", "Chronic Illness", "Arthritis", "Skin Issues"]
+MEDICAL_HISTORY = ["Vaccinations up to date", "Spayed", "Neutered", "Surgeries"]
+BREEDS = {
+    "Dog": ["Golden Retriever", "Labrador", "Beagle", "Bulldog"],
+    "Cat": ["Siamese", "Persian", "Bengal", "Maine Coon"],
+    "Rabbit": ["Lop", "Rex", "Angora", "Dwarf"],
+    "Bird": ["Parrot", "Canary", "Finch", "Cockatiel"],
+}
+SPECIES = list(BREEDS)
+
+
+def table_rows(scale=1.0):
+    """Row count of each sheet at `scale`, without building anything."""
+    return {table: _scaled(rows, scale) for table, rows in TABLE_SIZES.items()}
+
+
+def generate_tables(scale=1.0, seed=42, today=None, pool=None):
+    """Builds the six sheets as {sheet name: DataFrame}."""
+    rng = np.random.default_rng(seed)
+    pool = pool if pool is not None else FakerPool(seed=seed)
+    today = today or datetime.now()
+    rows = table_rows(scale)
+    num_pets = rows['Pets']
+
+    species = rng.integers(0, len(SPECIES), num_pets)
+    breed_labels = [breed for name in SPECIES for breed in BREEDS[name]]
+    breeds = species * 4 + rng.integers(0, 4, num_pets) # Each species owns 4 consecutive breeds
+    pets = pd.DataFrame({
+        "Pet ID": np.arange(1, num_pets + 1),
+        "Name": pool.draw("first_name", num_pets, rng=rng),
+        "Species": pd.Categorical.from_codes(species, categories=SPECIES),
+        "Breed": pd.Categorical.from_codes(breeds, categories=breed_labels),
+        "Age": rng.integers(1, 15, num_pets),
+        "Weight": rng.uniform(1, 50, num_pets).round(2),
+        "Health Conditions": _choice(rng, HEALTH_CONDITIONS, num_pets),
+        "Medical History": _choice(rng, MEDICAL_HISTORY, num_pets),
+    })
+
+    n = rows['Wellness Data']
+    wellness_data = pd.DataFrame({
+        "Pet ID": _pet_ids(rng, num_pets, n),
+        "Activity Level": _choice(rng, ["Low", "Moderate", "High"], n),
+        "Sleep Pattern": rng.integers(5, 15, n),
+        "Diet": _choice(rng, ["Kibble", "Wet Food", "Raw Diet"], n),
+        "Grooming Habits": _choice(rng, ["Daily", "Weekly", "Monthly"], n),
+        "Health Metrics": _choice(rng, ["Normal", "Elevated", "Low"], n),
+    })
+
+    n = rows['IoT Device Data']
+    iot_data = pd.DataFrame({
+        "Device ID": np.arange(1, n + 1),
+        "Pet ID": _pet_ids(rng, num_pets, n),
+        "Device Type": _choice(rng, ["Smart Collar", "Activity Tracker"], n),
+        "Data Type": _choice(rng, ["Activity", "Sleep", "Location"], n),
+        "Timestamp": _this_year(rng, n, today, 's'),
+        "Value": rng.integers(1, 10000, n),
+    })
+
+    n = rows['Veterinary Records']
+    vet_records = pd.DataFrame({
+        "Vet ID": np.arange(1, n + 1),
+        "Pet ID": _pet_ids(rng, num_pets, n),
+        "Visit Date": _this_year(rng, n, today, 'D'),
+        "Diagnosis": _choice(rng, ["Vaccination", "Injury", "Dental Cleaning", "Check-up"], n),
+        "Treatment": _choice(rng, ["Booster Shot", "Antibiotics", "Surgery", "None"], n),
+        "Medication": _choice(rng, ["None", "Painkillers", "Antibiotics", "Anti-inflammatory"], n),
+    })
+
+    n = rows['Predictive Alerts']
+    predictive_alerts = pd.DataFrame({
+        "Alert ID": np.arange(1, n + 1),
+        "Pet ID": _pet_ids(rng, num_pets, n),
+        "Alert Type": _choice(rng, ["Vaccination Due", "Check-up Scheduled"], n),
+        "Alert Date": _this_year(rng, n, today, 'D'),
+        "Alert Status": _choice(rng, ["Sent", "Read", "Dismissed"], n),
+    })
+
+    n = rows['Recommendations']
+    text_codes, texts = pool.draw_codes("text", n, rng=rng, max_nb_chars=50)
+    recommendations = pd.DataFrame({
+        "Recommendation ID": np.arange(1, n + 1),
+        "Pet ID": _pet_ids(rng, num_pets, n),
+        "Recommendation Type": _choice(rng, ["Diet", "Exercise", "Vet Visit"], n),
+        "Recommendation Text": pd.Categorical.from_codes(text_codes, categories=pd.Index(texts)),
+        "Recommendation Date": _this_year(rng, n, today, 'D'),
+    })
+
+    return {
+        "Pets": pets,
+        "Wellness Data": wellness_data,
+        "IoT Device Data": iot_data,
+        "Veterinary Records": vet_records,
+        "Predictive Alerts": predictive_alerts,
+        "Recommendations": recommendations,
+    }
+
+
+def _scaled(base, scale):
+    return max(1, int(round(base * scale)))
+
+
+def _choice(rng, labels, count):
+    return pd.Categorical.from_codes(rng.integers(0, len(labels), count, dtype=np.int8), categories=labels)
+
+
+def _pet_ids(rng, num_pets, count):
+    return rng.integers(1, num_pets + 1, count)
+
+
+def _this_year(rng, count, today, unit):
+    """Uniform datetime64[ns] values from January 1 of `today`'s year up to `today`, truncated to `unit` ('D' or 's')."""
+    start = np.datetime64(datetime(today.year, 1, 1), unit)
+    span = (np.datetime64(today, unit) - start).astype(np.int64) + 1
+    return (start + rng.integers(0, span, count)).astype('datetime64[ns]')
@@ -0,0 +1,259 @@
+"""
+Benchmarks for the dataset generators, with regression checks against a baseline.
+
+    python Shared/benchmark.py                                   # every case at scale 0.1 and 1
+    python Shared/benchmark.py reviews journeys --scale 1 10 --set ENGINE=vectorized
+    python Shared/benchmark.py --update-baseline                 # store this machine's numbers
+
+Each case runs at each scale factor in a fresh Python process, which makes the
+peak resident memory that process's own.
+
+- The Ghost Reviews cases (businesses, reviews, journeys) run the numbered
+  scripts exactly as shipped. They run in a scratch directory, with
+  NUM_BUSINESSES / NUM_JOURNEYS scaled and any --set constants swapped in
+  (e.g. ENGINE, WORKERS, OUTPUT_FORMAT). reviews and journeys read the business
+  table that businesses wrote at the same scale; with CHUNK_SIZE set, also set
+  INPUT_PARTS_DIR=simulated_businesses_parts so they read the streamed parts.
+- The parking, instagram and pet cases go through generate_datasets.run, in
+  --format (parquet by default).
+
+Wall time covers the script or run call only. numpy and pandas are imported
+before the clock starts, so small scales aren't dominated by import time.
+
+Results go to --output as JSON:
+- machine details;
+- one record per case and scale, with rows, seconds, rows_per_second and
+  peak_rss_mb;
+- the --set constants used.
+
+When the baseline file exists, every record is compared with the baseline record
+for the same case, scale and settings. The run fails (exit code 1) when
+rows/second drops or peak memory grows by more than --threshold (default 20%).
+Cases that finish well inside a second are noisy, so gate on larger scales or
+use --repeat.
+
+The stored baseline (benchmark_baseline.json) was measured on a single core.
+Timings don't carry across machines, so refresh it with --update-baseline
+before comparing on other hardware.
+"""
+import argparse
+import ast
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+GHOST_REVIEWS = ROOT / 'Ghost Reviews' / 'Scripts'
+DEFAULT_BASELINE = Path(__file__).resolve().parent / 'benchmark_baseline.json'
+DEFAULT_SCALES = (0.1, 1.0)
+DEFAULT_THRESHOLD = 0.2
+
+# Script cases: the script, its size constants at scale 1, the case it reads the
+# output of, and how to count the rows it wrote from its variables. The presorted
+# review engine never holds its table, so reviews are counted by the audit.
+# Dataset cases name a generate_datasets generator.
+CASES = {
+    'businesses': {'script': '1. Businesses.py', 'constants': {'NUM_BUSINESSES': 2500}, 'needs': None,
+                   'rows': lambda namespace: len(namespace['df']) if 'df' in namespace else namespace['NUM_BUSINESSES']},
+    'reviews': {'script': '2. Reviews.py', 'constants': {}, 'needs': 'businesses',
+                'rows': lambda namespace: namespace['review_audit'].rows},
+    'journeys': {'script': '3. Customer Journey.py', 'constants': {'NUM_JOURNEYS': 25000}, 'needs': 'businesses',
+                 'rows': lambda namespace: len(namespace['df_journeys'])},
+    'parking': {'dataset': 'parking'},
+    'instagram': {'dataset': 'instagram'},
+    'pet': {'dataset': 'pet'},
+}
+
+
+def run_benchmarks(cases=tuple(CASES), scales=DEFAULT_SCALES, settings=None, fmt='parquet', seed=42, repeat=1):
+    """
+    Runs every case at every scale and returns one result record per pair. With
+    `repeat` > 1 the fastest run is kept, so the first run's Faker pool building
+    and cold caches drop out.
+    """
+    settings = settings or {}
+    results = []
+    for scale in scales:
+        with tempfile.TemporaryDirectory(prefix='benchmark-') as workdir:
+            done = set()
+            for case in (c for c in CASES if c in cases): # Dependency order
+                needs = CASES[case].get('needs')
+                if needs and needs not in done:
+                    _measure(needs, scale, settings, fmt, seed, workdir) # Writes the input; not recorded
+                    done.add(needs)
+                runs = [_measure(case, scale, settings, fmt, seed, workdir) for _ in range(repeat)]
+                done.add(case)
+                best = min(runs, key=lambda run: run['seconds'])
+                results.append({'case': case, 'scale': scale,
+                                'settings': settings if 'script' in CASES[case] else {'format': fmt, 'seed': seed}, **best})
+                _print_result(results[-1])
+    return results
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Matches each result to the baseline record with the same case, scale and
+    settings. Returns a list of comparisons, each with the relative change in
+    rows/second and peak memory and a `regression` flag for changes past `threshold`.
+    """
+    stored = {_key(record): record for record in baseline}
+    comparisons = []
+    for record in results:
+        before = stored.get(_key(record))
+        if before is None:
+            continue
+        speed = record['rows_per_second'] / before['rows_per_second'] - 1
+        memory = record['peak_rss_mb'] / before['peak_rss_mb'] - 1
+        comparisons.append({'case': record['case'], 'scale': record['scale'], 'speed_change': speed,
+                            'memory_change': memory, 'regression': speed < -threshold or memory > threshold})
+    return comparisons
+
+
+def machine():
+    """What the numbers were measured on."""
+    return {'python': platform.python_version(), 'platform': platform.platform(), 'processor': platform.processor(),
+            'cpus': os.cpu_count()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the dataset generators and check for regressions.')
+    parser.add_argument('cases', nargs='*', metavar='case', help=f"cases to run: {', '.join(CASES)} (default: all)")
+    parser.add_argument('--scale', '-s', type=float, nargs='+', default=list(DEFAULT_SCALES), help='scale factors (default: 0.1 1)')
+    parser.add_argument('--set', dest='settings', action='append', default=[], metavar='NAME=VALUE',
+                        help="constant to override in the Ghost Reviews scripts, e.g. ENGINE=vectorized (repeatable)")
+    parser.add_argument('--format', '-f', dest='fmt', choices=('csv', 'parquet', 'xlsx'), default='parquet',
+                        help='output format of the parking, instagram and pet cases (default: parquet)')
+    parser.add_argument('--seed', type=int, default=42, help='seed of the parking, instagram and pet cases (default: 42)')
+    parser.add_argument('--repeat', type=int, default=1, help='runs per case and scale; the fastest is kept (default: 1)')
+    parser.add_argument('--output', '-o', default='benchmark_results.json', help='where to write the results')
+    parser.add_argument('--baseline', default=str(DEFAULT_BASELINE), help='baseline to compare against')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='relative slowdown or memory growth that counts as a regression (default: 0.2)')
+    parser.add_argument('--update-baseline', action='store_true', help='also write the results as the new baseline')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        _child(json.loads(args.child))
+        return 0
+
+    unknown = [case for case in args.cases if case not in CASES]
+    if unknown:
+        parser.error(f"Unknown case(s) {', '.join(unknown)}; choose from {', '.join(CASES)}")
+    if args.threshold < 0:
+        parser.error('--threshold must not be negative')
+    settings = dict(_setting(parser, text) for text in args.settings)
+    results = run_benchmarks(args.cases or tuple(CASES), args.scale, settings, args.fmt, args.seed, args.repeat)
+    report = {'created': datetime.now().isoformat(timespec='seconds'), 'machine': machine(), 'results': results}
+    Path(args.output).write_text(json.dumps(report, indent=2))
+    print(f"\n[+] Results saved to {args.output}")
+
+    baseline_path = Path(args.baseline)
+    if args.update_baseline:
+        baseline_path.write_text(json.dumps(report, indent=2))
+        print(f"[+] Baseline updated at {baseline_path}")
+        return 0
+    if not baseline_path.exists():
+        print(f"[*] No baseline at {baseline_path}; run with --update-baseline to store one")
+        return 0
+
+    comparisons = compare(results, json.loads(baseline_path.read_text())['results'], args.threshold)
+    print(f"\nAgainst {baseline_path.name} (threshold {args.threshold:.0%}):")
+    for row in comparisons:
+        flag = 'REGRESSION' if row['regression'] else ''
+        print(f"    {row['case']:<12} x{row['scale']:<8g} rows/s {row['speed_change']:+7.1%}   peak memory {row['memory_change']:+7.1%}   {flag}")
+    if not comparisons:
+        print("    No matching records (different cases, scales or --set constants)")
+    regressions = sum(row['regression'] for row in comparisons)
+    if regressions:
+        print(f"[!] {regressions} regression(s) past {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+def _measure(case, scale, settings, fmt, seed, workdir):
+    """Runs one case in a fresh interpreter and returns its measurements."""
+    result_path = Path(workdir) / f'{case}.result.json'
+    job = {'case': case, 'scale': scale, 'settings': settings, 'fmt': fmt, 'seed': seed, 'result': str(result_path)}
+    process = subprocess.run([sys.executable, __file__, '--child', json.dumps(job)], cwd=workdir,
+                             stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    if process.returncode != 0:
+        raise RuntimeError(f"Benchmark case '{case}' at scale {scale:g} failed:\n{process.stderr[-2000:]}")
+    return json.loads(result_path.read_text())
+
+
+def _child(job):
+    """Runs inside the fresh interpreter: one case, timed, then its measurements to job['result']."""
+    import numpy # noqa: F401 -- shared by every case; imported before the clock starts
+    import pandas # noqa: F401
+
+    spec = CASES[job['case']]
+    if 'script' in spec:
+        sys.path.insert(0, str(GHOST_REVIEWS))
+        path = GHOST_REVIEWS / spec['script']
+        constants = {name: max(1, int(round(base * job['scale']))) for name, base in spec['constants'].items()}
+        code = _with_constants(path, {**job['settings'], **constants})
+        namespace = {'__name__': '__main__', '__file__': str(path)}
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            exec(code, namespace)
+        seconds = time.perf_counter() - started
+        rows = spec['rows'](namespace)
+    else:
+        sys.path.insert(0, str(ROOT / 'Shared'))
+        import generate_datasets
+
+        started = time.perf_counter()
+        generate_datasets.run(spec['dataset'], job['scale'], job['seed'], spec['dataset'], job['fmt'])
+        seconds = time.perf_counter() - started
+        rows = sum(generate_datasets.table_rows(spec['dataset'], job['scale']).values())
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_bytes = peak if sys.platform == 'darwin' else peak * 1024 # Bytes on macOS, KiB on Linux
+    Path(job['result']).write_text(json.dumps({
+        'rows': rows, 'seconds': round(seconds, 3), 'rows_per_second': round(rows / max(seconds, 1e-9)),
+        'peak_rss_mb': round(peak_bytes / 2**20, 1),
+    }))
+
+
+def _with_constants(path, constants):
+    """Compiles a script with the top-level assignments of `constants` replaced by the given values."""
+    tree = ast.parse(path.read_text(encoding='utf-8'), str(path))
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            name = node.targets[0].id
+            if name in constants:
+                node.value = ast.copy_location(ast.parse(repr(constants[name]), mode='eval').body, node.value)
+    return compile(ast.fix_missing_locations(tree), str(path), 'exec')
+
+
+def _setting(parser, text):
+    name, sep, value = text.partition('=')
+    if not sep or not name.isidentifier():
+        parser.error(f"--set takes NAME=VALUE, not '{text}'")
+    try:
+        return name, ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return name, value # Bare words such as ENGINE=vectorized
+
+
+def _key(record):
+    return record['case'], record['scale'], json.dumps(record['settings'], sort_keys=True)
+
+
+def _print_result(record):
+    print(f"{record['case']:<12} x{record['scale']:<8g} {record['rows']:>12,} rows {record['seconds']:>9.2f}s "
+          f"{record['rows_per_second']:>12,} rows/s {record['peak_rss_mb']:>9,.1f} MB peak")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
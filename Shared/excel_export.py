@@ -0,0 +1,140 @@
+"""
+Streaming multi-sheet Excel export for the dataset generators.
+
+`pd.ExcelWriter(engine='xlsxwriter')` + `to_excel` builds every cell of every
+sheet in memory (pandas formats each one into a cell object first, xlsxwriter
+keeps them all until the file is closed), so memory grows with the row count.
+export_sheets opens the workbook in xlsxwriter's constant_memory mode, where
+each row is flushed to disk as soon as the next one starts, and feeds it one
+chunk of rows at a time, so only one chunk is ever held as Python values.
+
+Every column gets one cell type: numbers (NaN left blank), booleans, dates
+(datetime64 or date objects, with a date format, plus the time when any value
+has one) and text. Categoricals are written as their labels.
+
+A sheet holds at most EXCEL_MAX_ROWS rows including the header. With
+`sidecar='csv'` or `'parquet'` every table is also written in full to its own
+file, on a thread pool while the workbook is being written; a table too long
+for a sheet always gets a side-car (CSV unless told otherwise), and its sheet
+keeps the first rows that fit.
+
+    export_sheets({'Products': products_df, 'Transactions': transactions_df}, 'dataset.xlsx', sidecar='parquet')
+"""
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+EXCEL_MAX_ROWS = 1_048_576 # Per sheet, header row included
+DEFAULT_CHUNK_ROWS = 50_000
+SIDECAR_FORMATS = ('csv', 'parquet')
+DATE_FORMAT = 'yyyy-mm-dd'
+DATETIME_FORMAT = 'yyyy-mm-dd hh:mm:ss'
+
+# xlsxwriter method for each kind of column
+_WRITERS = {'number': 'write_number', 'bool': 'write_boolean', 'date': 'write_datetime', 'datetime': 'write_datetime', 'text': 'write_string'}
+
+
+def export_sheets(sheets, path, sidecar=None, sidecar_dir=None, chunk_rows=DEFAULT_CHUNK_ROWS, workers=2):
+    """
+    Writes each {sheet name: DataFrame} of `sheets` to the workbook at `path`,
+    in order, and returns {sheet name: side-car path} for the side-cars written.
+
+    Side-cars are named `<workbook stem>_<sheet name>.<format>` (sheet name
+    lowercased, punctuation dropped) and go to `sidecar_dir`, by default the
+    workbook's folder.
+    """
+    import xlsxwriter # Only needed for the workbook itself
+
+    if sidecar is not None and sidecar not in SIDECAR_FORMATS:
+        raise ValueError(f"Unknown side-car format '{sidecar}'; use one of {SIDECAR_FORMATS}.")
+    path = Path(path)
+    sidecar_dir = Path(sidecar_dir) if sidecar_dir else path.parent
+    sidecar_dir.mkdir(parents=True, exist_ok=True)
+
+    # Side-cars are plain file writes, so they run alongside the workbook instead of after it
+    sidecars = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for name, df in sheets.items():
+            fmt = sidecar or ('csv' if len(df) >= EXCEL_MAX_ROWS else None)
+            if fmt:
+                sidecars[name] = pool.submit(_write_sidecar, df, sidecar_dir / f'{path.stem}_{_slug(name)}.{fmt}', fmt)
+
+        workbook = xlsxwriter.Workbook(str(path), {'constant_memory': True})
+        formats = {
+            'header': workbook.add_format({'bold': True, 'border': 1}),
+            'date': workbook.add_format({'num_format': DATE_FORMAT}),
+            'datetime': workbook.add_format({'num_format': DATETIME_FORMAT}),
+        }
+        try:
+            for name, df in sheets.items():
+                _write_sheet(workbook.add_worksheet(name), df.iloc[:EXCEL_MAX_ROWS - 1], formats, chunk_rows)
+                if len(df) >= EXCEL_MAX_ROWS:
+                    print(f"[!] '{name}' has {len(df):,} rows; the sheet keeps the first {EXCEL_MAX_ROWS - 1:,}, "
+                          f"the full table is in {sidecars[name].result()}")
+        finally:
+            workbook.close()
+        return {name: future.result() for name, future in sidecars.items()}
+
+
+def _write_sheet(worksheet, df, formats, chunk_rows):
+    worksheet.write_row(0, 0, [str(column) for column in df.columns], formats['header'])
+    kinds = [_cell_kind(df[column]) for column in df.columns]
+    writers = [(getattr(worksheet, _WRITERS[kind]), formats.get(kind)) for kind in kinds]
+
+    # constant_memory needs the rows in order, and each chunk is turned into Python values only once
+    for start in range(0, len(df), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        columns = [_cell_values(chunk[column], kind) for column, kind in zip(chunk.columns, kinds)]
+        for row, values in enumerate(zip(*columns), start=start + 1):
+            for col, (value, (write, cell_format)) in enumerate(zip(values, writers)):
+                if value is not None: # Missing values are left blank
+                    write(row, col, value, cell_format)
+
+
+def _cell_kind(values):
+    """'number', 'bool', 'date', 'datetime' or 'text': how every cell of a column is written."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return 'text'
+    if pd.api.types.is_bool_dtype(values):
+        return 'bool'
+    if pd.api.types.is_numeric_dtype(values):
+        return 'number'
+    if not pd.api.types.is_datetime64_any_dtype(values):
+        inferred = pd.api.types.infer_dtype(values, skipna=True)
+        if inferred == 'boolean':
+            return 'bool'
+        if inferred not in ('date', 'datetime'):
+            return 'text'
+        values = pd.to_datetime(values)
+    # Date-only columns shouldn't show a midnight time
+    return 'datetime' if (values.dropna().dt.normalize() != values.dropna()).any() else 'date'
+
+
+def _cell_values(values, kind):
+    """One chunk of a column as a list of Python values, with None for missing."""
+    if kind == 'number':
+        values = values.to_numpy(dtype='float64', na_value=np.nan)
+        cells = values.tolist()
+        for i in np.flatnonzero(~np.isfinite(values)).tolist(): # Excel has no NaN or infinity
+            cells[i] = None
+        return cells
+    if kind in ('date', 'datetime'):
+        values = pd.DatetimeIndex(pd.to_datetime(values)).tz_localize(None) # Excel has no time zones
+        return [None if value is pd.NaT else value for value in values.to_pydatetime().tolist()]
+    values = values.astype(object)
+    return [None if value is None or value != value else (value if kind == 'bool' else str(value)) for value in values.tolist()]
+
+
+def _write_sidecar(df, path, fmt):
+    if fmt == 'parquet':
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+    return path
+
+
+def _slug(name):
+    return re.sub(r'[^0-9a-z]+', '_', name.lower()).strip('_')
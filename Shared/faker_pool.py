@@ -0,0 +1,142 @@
+"""
+Pooled, disk-cached Faker values for the dataset generators.
+
+A Faker call costs tens of microseconds (fake.text far more), and the
+generators make one per row per column: fake.city() for every transaction,
+fake.company() for every business, faker.first_name() for every pet. FakerPool
+calls each method `size` times once, with a seeded Faker, and keeps the distinct
+values with how often each came up. Draws are then a single NumPy choice over
+the pool, weighted by those counts, so values keep Faker's frequencies (common
+first names stay common) at close to no cost per row.
+
+Pools are saved under FAKER_POOL_DIR (by default ~/.cache/faker_pools) and
+reloaded by later runs with the same method, arguments, seed, size, locale and
+Faker version. Methods whose values move with the calendar (anything with
+'date' or 'time' in the name, e.g. date_this_year) also key on today's date.
+Saved pools hold plain arrays only (fixed-width unicode, datetime64 or numbers)
+and are loaded without pickle, since the directory may be shared; pools of any
+other kind of value stay in memory.
+
+    pool = FakerPool(seed=42)
+    cities = pool.draw('city', 100_000)
+    blurbs = pool.draw('text', 1_000, max_nb_chars=50)
+"""
+import hashlib
+import os
+from functools import lru_cache
+from importlib import metadata
+from datetime import date, datetime
+from pathlib import Path
+
+import numpy as np
+
+DEFAULT_POOL_SIZE = 10_000
+DEFAULT_CACHE_DIR = Path(os.environ.get('FAKER_POOL_DIR', Path.home() / '.cache' / 'faker_pools'))
+# Part of every key; bumped when the saved layout changes so older files are ignored
+POOL_FORMAT = 2
+
+
+class FakerPool:
+    """Seeded pools of Faker values, one per method and arguments, drawn in batches."""
+
+    def __init__(self, seed=0, size=DEFAULT_POOL_SIZE, locale=None, cache_dir=DEFAULT_CACHE_DIR):
+        self.seed = seed
+        self.size = size
+        self.locale = locale
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.rng = np.random.default_rng(seed)
+        self._pools = {}
+
+    def values(self, method, *args, **kwargs):
+        """(distinct values, counts) of a method's pool, built or loaded on first use."""
+        key = self._key(method, args, kwargs)
+        if key not in self._pools:
+            path = self.cache_dir / f'{method}-{key}.npz' if self.cache_dir else None
+            pool = _load(path) if path is not None and path.exists() else None
+            if pool is None:
+                pool = self._build(method, args, kwargs)
+                stored = _to_plain(pool[0])
+                if path is not None and stored is not None:
+                    _save(path, stored, pool[1])
+            self._pools[key] = pool
+        return self._pools[key]
+
+    def draw(self, method, n, *args, rng=None, **kwargs):
+        """`n` values of `method(*args, **kwargs)` as an object array, drawn with `rng` (default: the pool's own)."""
+        codes, values = self.draw_codes(method, n, *args, rng=rng, **kwargs)
+        return values[codes]
+
+    def draw_codes(self, method, n, *args, rng=None, **kwargs):
+        """
+        Like draw, but returns (codes, distinct values) with values[codes] being
+        the draw, e.g. for pd.Categorical.from_codes without materializing strings.
+        """
+        values, counts = self.values(method, *args, **kwargs)
+        rng = rng if rng is not None else self.rng
+        return rng.choice(len(values), size=n, p=counts / counts.sum()), values
+
+    def _build(self, method, args, kwargs):
+        from faker import Faker # Only needed when a pool isn't cached yet
+
+        fake = Faker(self.locale)
+        fake.seed_instance(self.seed)
+        generate = getattr(fake, method)
+        found = {}
+        for _ in range(self.size):
+            value = generate(*args, **kwargs)
+            found[value] = found.get(value, 0) + 1
+        values = np.empty(len(found), dtype=object)
+        values[:] = list(found)
+        return values, np.fromiter(found.values(), dtype=np.int64, count=len(found))
+
+    def _key(self, method, args, kwargs):
+        parts = [method, args, sorted(kwargs.items()), self.seed, self.size, self.locale, faker_version(), POOL_FORMAT]
+        if 'date' in method or 'time' in method:
+            parts.append(date.today().isoformat()) # e.g. date_this_year depends on when it runs
+        return hashlib.sha1(repr(parts).encode()).hexdigest()[:16]
+
+
+@lru_cache(maxsize=None)
+def faker_version():
+    """The installed Faker's version, read once from the package metadata (None if Faker isn't installed)."""
+    try:
+        return metadata.version('Faker')
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def _to_plain(values):
+    """The pool as an array np.load can read without pickle, or None when its values have no such form."""
+    items = list(values)
+    if all(isinstance(v, str) for v in items):
+        return np.array(items, dtype=str)
+    if all(isinstance(v, datetime) and v.tzinfo is None for v in items):
+        return np.array(items, dtype='datetime64[us]')
+    if all(isinstance(v, date) and not isinstance(v, datetime) for v in items):
+        return np.array(items, dtype='datetime64[D]')
+    if all(isinstance(v, (bool, int, float)) for v in items):
+        return np.array(items)
+    return None
+
+
+def _save(path, values, counts):
+    """
+    Writes a pool under a per-process temporary name, then renames it into place,
+    so concurrent runs sharing a pool (sweep workers, benchmark runs) never read a
+    half-written file.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(f'.{path.name}.{os.getpid()}.partial')
+    with open(partial, 'wb') as handle: # A file object, so savez doesn't append .npz to the name
+        np.savez(handle, values=values, counts=counts)
+    os.replace(partial, path)
+
+
+def _load(path):
+    """(values, counts) from a saved pool, or None when it can't be read without pickle."""
+    try:
+        with np.load(path, allow_pickle=False) as saved:
+            # Back to Python objects (str, date, datetime), as a freshly built pool holds them
+            return saved['values'].astype(object), saved['counts']
+    except (OSError, ValueError, KeyError):
+        return None
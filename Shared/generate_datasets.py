@@ -0,0 +1,200 @@
+"""
+One command-line entry point for the dataset generators.
+
+    python Shared/generate_datasets.py parking --scale 10 --seed 7 --output-dir out --format parquet
+    python Shared/generate_datasets.py ghost-reviews --scale 1000 --format parquet --dry-run
+
+Scale factor 1 is each generator's default size, and row counts grow linearly
+with it, TPC-style. Calendar tables stay fixed; for example, Parking's daily
+forecast keeps one row per day. Before anything is generated the command prints
+the rows it will write per table, plus an estimated runtime and peak memory.
+With --dry-run it stops there.
+
+The estimates come from the rates in GENERATORS and WRITE_ROWS_PER_SECOND,
+measured on one core. Treat them as orders of magnitude for sizing a machine.
+
+Formats:
+- 'xlsx': one workbook through excel_export. Sheets past Excel's row limit
+  also get a CSV side-car.
+- 'csv' / 'parquet': one file per table. Instagram VS Wallet streams them as
+  part files per table.
+
+Ghost Reviews runs its in-memory pipeline (pipeline.py) and writes csv or parquet.
+"""
+import argparse
+import importlib
+import re
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT / 'Shared'))
+from instrument import span
+
+# Per generator: where its engine lives, the formats it writes, the workbook name for
+# xlsx, and its measured cost: rows generated per second, peak bytes per row held and,
+# where its text columns make writing slower, its own write rates
+GENERATORS = {
+    'parking': {
+        'title': 'Urban Parking Optimization', 'folder': 'Parking Nomads/Scripts', 'engine': 'parking_engine',
+        'workbook': 'urban_parking_dataset.xlsx', 'formats': ('xlsx', 'csv', 'parquet'),
+        'rows_per_second': 4_000_000, 'bytes_per_row': 60,
+    },
+    'instagram': {
+        'title': 'Instagram VS Wallet', 'folder': 'Instagram VS Wallet/Scripts', 'engine': 'commerce_engine',
+        'workbook': 'dataset.xlsx', 'formats': ('xlsx', 'csv', 'parquet'),
+        'rows_per_second': 1_500_000, 'bytes_per_row': 250,
+    },
+    'pet': {
+        'title': 'Pet Wellness Tracker', 'folder': 'Pet Wellness Intelligence Network/Script', 'engine': 'pet_engine',
+        'workbook': 'pet_wellness_tracker_dataset.xlsx', 'formats': ('xlsx', 'csv', 'parquet'),
+        'rows_per_second': 2_500_000, 'bytes_per_row': 90,
+    },
+    'ghost-reviews': {
+        'title': 'Ghost Reviews', 'folder': 'Ghost Reviews/Scripts', 'engine': 'pipeline',
+        'workbook': None, 'formats': ('csv', 'parquet'),
+        'rows_per_second': 100_000, 'bytes_per_row': 300, 'write_rows_per_second': {'csv': 40_000},
+    },
+}
+
+# Ghost Reviews rows per unit of scale: 2,500 businesses, their reviews (about 83 each)
+# and up to 25,000 journeys (abandoned ones are dropped)
+GHOST_REVIEWS_TABLE_SIZES = {'simulated_businesses': 2500, 'simulated_reviews': 208_000, 'simulated_customer_journeys': 25000}
+
+# Write throughput by output format, across all generators
+WRITE_ROWS_PER_SECOND = {'xlsx': 15_000, 'csv': 200_000, 'parquet': 2_000_000}
+
+# The fixed date window of the Instagram VS Wallet tables, as in its script
+INSTAGRAM_START, INSTAGRAM_END = datetime(2022, 1, 1), datetime(2023, 12, 31)
+
+# Interpreter, pandas and pyarrow before any data
+BASE_MEMORY_BYTES = 150 * 2**20
+
+
+def table_rows(name, scale):
+    """{table: rows} that generator `name` writes at `scale`."""
+    if name == 'ghost-reviews':
+        return {table: max(1, int(round(rows * scale))) for table, rows in GHOST_REVIEWS_TABLE_SIZES.items()}
+    return _engine(name).table_rows(scale)
+
+
+def estimate(name, scale, fmt):
+    """(rows per table, estimated seconds, estimated peak bytes) of a run."""
+    spec = GENERATORS[name]
+    rows = table_rows(name, scale)
+    total = sum(rows.values())
+    write_rate = spec.get('write_rows_per_second', {}).get(fmt, WRITE_ROWS_PER_SECOND[fmt])
+    seconds = total / spec['rows_per_second'] + total / write_rate
+    held = total
+    if name == 'instagram' and fmt != 'xlsx':
+        # Streamed a chunk at a time; only the 6-byte join keys of every transaction are kept,
+        # plus a 4-byte shuffle of the transaction rows while the resale sources are drawn
+        chunk = _engine(name).DEFAULT_CHUNK_SIZE
+        held = min(total, chunk) + rows['Transactions'] * 10 / spec['bytes_per_row']
+    return rows, seconds, BASE_MEMORY_BYTES + held * spec['bytes_per_row']
+
+
+def run(name, scale, seed, output_dir, fmt, workers=1):
+    """
+    Generates and writes one dataset; returns the paths written. Generation and
+    writing run in 'generation loop' and 'write' spans (instrument.py); Ghost
+    Reviews traces its own stages.
+    """
+    spec = GENERATORS[name]
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    engine = _engine(name)
+
+    if name == 'ghost-reviews':
+        sizes = table_rows(name, scale)
+        engine.run_pipeline(num_businesses=sizes['simulated_businesses'], num_journeys=sizes['simulated_customer_journeys'],
+                            seed=seed, workers=workers, output_dir=output_dir, fmt=fmt)
+        return [output_dir / f'{stem}.{fmt}' for stem in engine.OUTPUT_NAMES.values()]
+
+    if name == 'instagram':
+        rows = engine.table_rows(scale)
+        sizes = [rows[table] for table in engine.TABLES]
+        if fmt != 'xlsx':
+            with span('generation loop', rows=sum(sizes)): # Streamed: every chunk is written as it is built
+                parts = engine.write_table_parts(output_dir, *sizes, INSTAGRAM_START, INSTAGRAM_END, seed=seed, fmt=fmt)
+            return [path for paths in parts.values() for path in paths]
+        with span('generation loop', rows=sum(sizes)):
+            tables = engine.generate_tables(*sizes, INSTAGRAM_START, INSTAGRAM_END, seed=seed)
+    else:
+        with span('generation loop') as generation:
+            tables = engine.generate_tables(scale=scale, seed=seed)
+            generation.rows = sum(len(df) for df in tables.values())
+
+    with span('write', rows=sum(len(df) for df in tables.values())):
+        if fmt == 'xlsx':
+            from excel_export import export_sheets
+
+            path = output_dir / spec['workbook']
+            sidecars = export_sheets(tables, path)
+            return [path] + list(sidecars.values())
+        paths = []
+        for table, df in tables.items():
+            path = output_dir / f"{re.sub(r'[^0-9a-z]+', '_', table.lower()).strip('_')}.{fmt}"
+            if fmt == 'parquet':
+                df.to_parquet(path, index=False)
+            else:
+                df.to_csv(path, index=False)
+            paths.append(path)
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate a portfolio dataset at a given scale factor.')
+    parser.add_argument('dataset', choices=sorted(GENERATORS))
+    parser.add_argument('--scale', '-s', type=float, default=1.0, help='scale factor; 1 is the default size (default: 1)')
+    parser.add_argument('--seed', type=int, default=42, help='random seed (default: 42)')
+    parser.add_argument('--output-dir', '-o', default='.', help='where to write (default: current directory)')
+    parser.add_argument('--format', '-f', dest='fmt', choices=('xlsx', 'csv', 'parquet'),
+                        help='output format (default: xlsx, or csv for ghost-reviews)')
+    parser.add_argument('--workers', type=int, default=1, help='worker processes (ghost-reviews only)')
+    parser.add_argument('--dry-run', action='store_true', help='print the estimate and stop')
+    args = parser.parse_args(argv)
+
+    spec = GENERATORS[args.dataset]
+    fmt = args.fmt or spec['formats'][0]
+    if fmt not in spec['formats']:
+        parser.error(f"{args.dataset} writes {', '.join(spec['formats'])}, not {fmt}")
+    if args.scale <= 0:
+        parser.error('--scale must be positive')
+
+    rows, seconds, peak = estimate(args.dataset, args.scale, fmt)
+    print(f"{spec['title']} at scale factor {args.scale:g} (seed {args.seed}) -> {Path(args.output_dir).resolve()} as {fmt}")
+    for table, count in rows.items():
+        print(f"    {table:<30} {count:>15,} rows")
+    print(f"    {'total':<30} {sum(rows.values()):>15,} rows")
+    print(f"[*] Estimated runtime {_duration(seconds)}, peak memory {peak / 2**30:.1f} GB")
+    if fmt == 'xlsx' and max(rows.values()) >= 1_048_576:
+        print("[!] Some sheets pass Excel's row limit; their full tables go to CSV side-cars")
+    if args.dry_run:
+        return
+
+    started = time.perf_counter()
+    paths = run(args.dataset, args.scale, args.seed, args.output_dir, fmt, workers=args.workers)
+    print(f"[+] Wrote {len(paths)} file(s) in {_duration(time.perf_counter() - started)}")
+
+
+def _engine(name):
+    """Imports a generator's engine module from its project folder."""
+    folder = str(ROOT / GENERATORS[name]['folder'])
+    if folder not in sys.path:
+        sys.path.insert(0, folder)
+    return importlib.import_module(GENERATORS[name]['engine'])
+
+
+def _duration(seconds):
+    if seconds < 60:
+        return f'{seconds:.0f}s'
+    if seconds < 3600:
+        return f'{seconds // 60:.0f}m {seconds % 60:.0f}s'
+    return f'{seconds // 3600:.0f}h {seconds % 3600 // 60:.0f}m'
+
+
+if __name__ == '__main__':
+    main()
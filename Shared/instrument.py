@@ -0,0 +1,165 @@
+"""
+Named spans around the phases of a generator run: load, self-heal, user
+population, generation loop, noise injection, sort, write.
+
+Each span times its phase and counts the rows it handled. The scripts' print
+calls are still the human-readable progress; spans are for measuring. They are
+switched on from the environment, so a production run can be watched without
+editing a script:
+
+    GENERATOR_TRACE=trace.jsonl python "2. Reviews.py"       # one JSON line per span ('-' for stderr)
+    GENERATOR_TRACEMALLOC=1 ...                              # add tracemalloc peaks (slows Python-heavy loops)
+    GENERATOR_PROFILE="generation loop" ...                  # cProfile these spans ('*' for all)
+    GENERATOR_PROFILE_DIR=profiles GENERATOR_PROFILE_SORT=tottime ...
+
+A span event carries:
+- the script and process id;
+- the span name and its enclosing span;
+- seconds, rows and rows/s;
+- with tracemalloc on, the peak and net growth of traced memory during the span.
+
+A profiled span writes <script>.<span>.prof (for pstats or snakeviz) and a
+.txt with its top functions, sorted by GENERATOR_PROFILE_SORT (cumulative by
+default). A span that runs again gets numbered files, and the event names the
+file. Only one profiler runs at a time, so spans nested inside a profiled span
+are not profiled themselves.
+
+With none of these set, a span costs two perf_counter calls.
+"""
+import cProfile
+import json
+import os
+import pstats
+import re
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+TRACE = os.environ.get('GENERATOR_TRACE')
+TRACEMALLOC = os.environ.get('GENERATOR_TRACEMALLOC', '') not in ('', '0')
+PROFILE = {name.strip() for name in os.environ.get('GENERATOR_PROFILE', '').split(',') if name.strip()}
+PROFILE_DIR = Path(os.environ.get('GENERATOR_PROFILE_DIR', '.'))
+PROFILE_SORT = os.environ.get('GENERATOR_PROFILE_SORT', 'cumulative')
+PROFILE_LINES = 40
+
+# The running script, relative to the repository root when it lives there ('Parking Nomads/Scripts/Dataset Generator.py')
+ROOT = Path(__file__).resolve().parents[1]
+SCRIPT = sys.argv[0] if sys.argv and sys.argv[0] else 'python'
+if Path(SCRIPT).resolve().is_relative_to(ROOT):
+    SCRIPT = Path(SCRIPT).resolve().relative_to(ROOT).as_posix()
+
+if TRACEMALLOC and not tracemalloc.is_tracing():
+    tracemalloc.start()
+
+_open_spans = []
+_profiling = False
+_profile_counts = {}
+
+
+class Span:
+    """
+    One timed phase. Use it as a context manager (set `rows` inside the block), or
+    call start() and stop(rows=...) around top-level script code. For a streamed
+    phase, add_rows counts each chunk as it goes.
+    """
+
+    def __init__(self, name, rows=None):
+        self.name = name
+        self.rows = rows
+        self.seconds = None
+        self.parent = None
+        self._started = None
+        self._peak = 0
+        self._traced_start = 0
+        self._profiler = None
+
+    def start(self):
+        global _profiling
+        self.parent = _open_spans[-1] if _open_spans else None
+        _open_spans.append(self)
+        if tracemalloc.is_tracing():
+            # One global peak: fold it into the enclosing span before resetting it for this one
+            self._traced_start, peak = tracemalloc.get_traced_memory()
+            if self.parent is not None:
+                self.parent._peak = max(self.parent._peak, peak)
+            tracemalloc.reset_peak()
+        if (self.name in PROFILE or '*' in PROFILE) and not _profiling:
+            self._profiler = cProfile.Profile()
+            _profiling = True
+            self._profiler.enable()
+        self._started = time.perf_counter()
+        return self
+
+    def add_rows(self, count):
+        self.rows = (self.rows or 0) + count
+
+    def stop(self, rows=None):
+        global _profiling
+        self.seconds = time.perf_counter() - self._started
+        if self._profiler is not None:
+            self._profiler.disable()
+            _profiling = False
+        if rows is not None:
+            self.rows = rows
+        if self in _open_spans:
+            _open_spans.remove(self)
+
+        event = {
+            'time': datetime.now().isoformat(timespec='milliseconds'), 'script': SCRIPT, 'pid': os.getpid(),
+            'span': self.name, 'parent': self.parent.name if self.parent is not None else None,
+            'seconds': round(self.seconds, 6), 'rows': self.rows,
+            'rows_per_second': round(self.rows / self.seconds) if self.rows and self.seconds > 0 else None,
+        }
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            self._peak = max(self._peak, peak)
+            if self.parent is not None:
+                self.parent._peak = max(self.parent._peak, self._peak)
+            tracemalloc.reset_peak()
+            event['traced_peak_mb'] = round(self._peak / 2**20, 2)
+            event['traced_growth_mb'] = round((current - self._traced_start) / 2**20, 2)
+        if self._profiler is not None:
+            event['profile'] = str(_dump_profile(self._profiler, self.name))
+            self._profiler = None
+        if TRACE:
+            _emit(event)
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def span(name, rows=None):
+    """A new, not yet started Span called `name`."""
+    return Span(name, rows)
+
+
+def _emit(event):
+    line = json.dumps(event, default=str)
+    if TRACE == '-':
+        print(line, file=sys.stderr, flush=True)
+    else:
+        with open(TRACE, 'a', encoding='utf-8') as handle: # Appended per event, so concurrent runs can share a file
+            handle.write(line + '\n')
+
+
+def _dump_profile(profiler, name):
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    stem = f"{_slug(str(Path(SCRIPT).with_suffix('')))}.{_slug(name)}"
+    _profile_counts[stem] = _profile_counts.get(stem, 0) + 1
+    if _profile_counts[stem] > 1: # A span that runs again (one write per table) keeps every profile
+        stem = f'{stem}.{_profile_counts[stem]}'
+    path = PROFILE_DIR / f'{stem}.prof'
+    profiler.dump_stats(path)
+    with open(PROFILE_DIR / f'{stem}.txt', 'w', encoding='utf-8') as handle:
+        pstats.Stats(profiler, stream=handle).sort_stats(PROFILE_SORT).print_stats(PROFILE_LINES)
+    return path
+
+
+def _slug(text):
+    return re.sub(r'[^0-9a-z]+', '_', text.lower()).strip('_') or 'span'